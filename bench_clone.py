@@ -0,0 +1,64 @@
+"""What does it cost to try a move and take it back?
+
+Run from the linux command line:
+python3 bench_clone.py --density 0.2 --size 5 --repeat 200
+
+Compares three ways a search can branch from a game: copy.deepcopy of the Model, Model.clone
+(entities copied, board layers shared until written) and checkpoint + a round + rollback,
+and prints the median time of each in microseconds. --size makes the room size x size, clone
+copies every entity, so its cost grows with the number of creatures in the room.
+"""
+import argparse
+import copy
+import statistics
+import time
+
+import board as b
+import index
+from custom_exceptions import DeathError
+
+
+def game(density, store, size=5):
+    model = index.Model(store=store, seed=0)
+    model.reset_board(b.Board((size, size), (size - 1, size // 2), (0, size // 2)))
+    controller = index.Controller(model, index.NullView(model=model))
+    controller.start_game()
+    controller.populate_room(density=density)
+    return controller
+
+
+def timed(fn, repeat):
+    """Median microseconds per call of fn."""
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6
+
+
+def try_round(controller, checkpoint):
+    try:
+        controller.round("d")
+    except DeathError:
+        pass
+    controller.model.rollback(checkpoint)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure branching a game.")
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--size", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for store in (False, True):
+        controller = game(args.density, store, args.size)
+        model = controller.model
+        print(f"store={store}, {len(model.creatures)} creatures")
+        print(f"  deepcopy           {timed(lambda: copy.deepcopy(model), args.repeat):9.1f} us")
+        print(f"  clone              {timed(model.clone, args.repeat):9.1f} us")
+        checkpoint = model.checkpoint()
+        rollback = timed(lambda: try_round(controller, checkpoint), args.repeat)
+        model.commit()
+        print(f"  round + rollback   {rollback:9.1f} us")
@@ -0,0 +1,47 @@
+"""How much memory does each floor item and creature cost, next to the same attributes kept in
+an ordinary instance __dict__ (the way entities were stored before they had __slots__)?
+
+Run from the linux command line:
+python3 bench_memory.py
+"""
+import tracemalloc
+
+import creatures as c
+import gear as g
+
+
+def bytes_per(factory, n=10000):
+    """Average bytes allocated per object when building n of them."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory() for i in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(x.size_diff for x in after.compare_to(before, "filename"))
+    # don't count the list holding them
+    allocated -= objects.__sizeof__()
+    return allocated / n
+
+
+def plain(entity_type):
+    """A factory for objects holding what a new entity_type holds in its slots, in a __dict__."""
+    names = [x for t in entity_type.__mro__ for x in getattr(t, "__slots__", ())]
+
+    # a class per entity type, as instances of one class share their dicts' keys
+    class Plain:
+        pass
+
+    def factory():
+        entity = entity_type()
+        other = Plain()
+        for name in names:
+            if hasattr(entity, name):
+                setattr(other, name, getattr(entity, name))
+        return other
+    return factory
+
+
+if __name__ == "__main__":
+    for entity_type in [g.Sword, g.HealthPotion, c.Goblin, c.Troll]:
+        slots, dicts = bytes_per(entity_type), bytes_per(plain(entity_type))
+        print(f"{entity_type.__name__}: {slots:.0f} bytes, {dicts:.0f} with a __dict__ ({slots / dicts:.2f}x)")
@@ -0,0 +1,79 @@
+"""How long does it take to get from `python3 index.py` to the first board?
+
+Run from the linux command line:
+python3 bench_startup.py --budget-ms 150
+
+Prints the median import time of index, the median time to first frame and the slowest
+imports, writes them to --out as JSON, and exits non-zero if time to first frame is over
+the budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+index_path = os.path.join(here, "index.py")
+
+
+def import_time():
+    """Seconds to import index in a fresh interpreter."""
+    code = "import time; t = time.perf_counter(); import index; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def first_frame_time():
+    """Seconds from launching index.py to the end of the first board it prints."""
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        game = subprocess.Popen([sys.executable, index_path], cwd=tmp, env=env, text=True,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        for line in game.stdout:
+            if line.startswith("level:"):
+                break
+        elapsed = time.perf_counter() - start
+        game.communicate("\nexit\n")
+    return elapsed
+
+
+def slowest_imports(n=5):
+    """The n modules with the largest cumulative import time, in microseconds."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import index"], cwd=here,
+                         capture_output=True, text=True, check=True)
+    times = []
+    for line in out.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        times.append((int(fields[1]), fields[2].strip()))
+    return sorted(times, reverse=True)[:n]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure startup time.")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--out", default="bench_startup.json")
+    args = parser.parse_args()
+
+    results = {
+        "import_ms": 1000 * statistics.median(import_time() for i in range(args.repeat)),
+        "first_frame_ms": 1000 * statistics.median(first_frame_time() for i in range(args.repeat)),
+        "slowest_imports_us": slowest_imports(),
+    }
+    print(f"import index:   {results['import_ms']:.1f} ms")
+    print(f"first frame:    {results['first_frame_ms']:.1f} ms")
+    for cumulative, name in results["slowest_imports_us"]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if args.budget_ms is not None and results["first_frame_ms"] > args.budget_ms:
+        print(f"Over budget: {results['first_frame_ms']:.1f} ms > {args.budget_ms} ms")
+        sys.exit(1)
@@ -0,0 +1,220 @@
+"""Benchmarks for the hot paths, at a range of room sizes and populations.
+
+Run from the linux command line:
+python3 bench_suite.py --out bench.json
+python3 bench_suite.py --out new.json --compare bench.json
+
+Every case is seeded, so numbers are comparable between runs. --compare flags any case
+that got slower than --threshold times its baseline and exits non-zero if there are any.
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import board as b
+import creatures as c
+import fov
+import gear as g
+import index
+import scores
+
+
+def build(size=5, creatures=0, floor_items=0, inventory=0, seed=0):
+    """A seeded room of the given size with goblins, floor gear and a stocked, unkillable player."""
+    model = index.Model(seed=seed)
+    model.reset_board(b.Board((size, size), (size - 1, size // 2), (0, size // 2)))
+    view = index.NullView(model=model)
+    controller = index.Controller(model, view)
+    model.player.hp = 1e12
+    for i in range(creatures):
+        controller.create_creature()
+    cells = [x for x in itertools.product(range(size), range(size)) if x != model.player.pos]
+    for i in range(floor_items):
+        item = g.Sword()
+        item.pos = cells[i % len(cells)]
+        model.floor_items.append(item)
+    model.player.items.extend(g.Helm() for i in range(inventory))
+    return model, view, controller
+
+
+def bench_round(size, creatures):
+    model, view, controller = build(size, creatures)
+    # nobody dies, so every call does the same amount of work
+    for creature in model.creatures:
+        creature.hp = 1e12
+    moves = itertools.cycle("ad")
+    return lambda: controller.round(next(moves))
+
+
+def bench_populate(size, creatures):
+    def run():
+        model, view, controller = build(size)
+        for i in range(creatures):
+            controller.create_creature()
+    return run
+
+
+def bench_populate_dense(size, density):
+    def run():
+        model, view, controller = build(size)
+        controller.populate_room(density)
+    return run
+
+
+def bench_attack(creatures):
+    model, view, controller = build(7, creatures)
+    defender = c.Troll()
+    defender.hp = 1e12
+    return lambda: controller.attack(model.player, defender)
+
+
+def bench_equip(inventory):
+    model, view, controller = build(inventory=inventory)
+    sword = g.Sword()
+    model.player.items.append(sword)
+
+    def run():
+        controller.equip(model.player, sword)
+        controller.unequip(model.player, sword)
+    return run
+
+
+def bench_print_board(size, creatures, floor_items):
+    model, view, controller = build(size, creatures, floor_items)
+    # a real View (so all the formatting happens) that writes nowhere
+    view = index.View(model=model, out=open(os.devnull, "w"))
+
+    def run():
+        view.print_board()
+        view.flush()
+    return run
+
+
+def bench_fov(size):
+    # a fresh field of view every call, as when the player moves every turn
+    model, view, controller = build(size)
+    model.board.set_terrain(np.random.default_rng(0).random(model.board.shape) < 0.1, b.WALL)
+    center = (size // 2, size // 2)
+    return lambda: fov.field_of_view(model.board.terrain, center, controller.fov.radius)
+
+
+def bench_save_score(history):
+    directory = tempfile.TemporaryDirectory()
+    store = scores.ScoreStore(os.path.join(directory.name, "high_scores"))
+    for i in range(history):
+        store.add(i % 50, "bench")
+    size = os.path.getsize(store.log_path) if history else 0
+    top = store.top()
+
+    def run():
+        store.add(7, "bench")
+
+    def reset():
+        # every batch starts from `history` games, not from what the batches before added
+        with open(store.log_path, "ab") as log:
+            log.truncate(size)
+        store._write_top(top)
+
+    run.reset = reset
+    run.close = directory.cleanup
+    return run
+
+
+def cases(quick=False):
+    """(benchmark name, function, parameters) for every case in the suite."""
+    sizes = [5, 20] if quick else [5, 20, 60]
+    populations = [3, 30] if quick else [3, 30, 300]
+    for size, n in itertools.product(sizes, populations):
+        if n < size * size // 2:
+            yield "round", bench_round, {"size": size, "creatures": n}
+            yield "populate_room", bench_populate, {"size": size, "creatures": n}
+            for floor_items in [0, n]:
+                yield "print_board", bench_print_board, {"size": size, "creatures": n, "floor_items": floor_items}
+    for size in sizes:
+        yield "populate_dense", bench_populate_dense, {"size": size, "density": 0.9}
+    for size in sizes + [300]:
+        yield "field_of_view", bench_fov, {"size": size}
+    for n in populations:
+        yield "attack", bench_attack, {"creatures": n}
+    for inventory in ([2, 50] if quick else [2, 50, 500]):
+        yield "equip_unequip", bench_equip, {"inventory": inventory}
+    for history in ([0, 1000] if quick else [0, 1000, 20000]):
+        yield "save_score", bench_save_score, {"history": history}
+
+
+def measure(func, budget=0.2, repeat=5):
+    """Seconds per call, from `repeat` batches each long enough to time reliably. If func has
+    a reset() it is called (untimed) before every batch, and its close() at the end."""
+    reset = getattr(func, "reset", lambda: None)
+    number = 1
+    while True:
+        reset()
+        start = time.perf_counter()
+        for i in range(number):
+            func()
+        if time.perf_counter() - start > budget / repeat / 10 or number > 10**6:
+            break
+        number *= 10
+    batches = []
+    for r in range(repeat):
+        reset()
+        start = time.perf_counter()
+        for i in range(number):
+            func()
+        batches.append((time.perf_counter() - start) / number)
+    if hasattr(func, "close"):
+        func.close()
+    return {"best": min(batches), "median": statistics.median(batches), "calls": number * repeat}
+
+
+def key(result):
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def run(quick=False):
+    results = []
+    for name, bench, params in cases(quick):
+        timing = measure(bench(**params))
+        results.append({"name": name, "params": params, **timing})
+        print(f"{key(results[-1]):60} {timing['best'] * 1e6:12.1f} us")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Cases slower than threshold times their baseline, as (key, old, new)."""
+    old = {key(x): x["best"] for x in baseline}
+    slower = []
+    for result in results:
+        k = key(result)
+        if k in old and result["best"] > threshold * old[k]:
+            slower.append((k, old[k], result["best"]))
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths.")
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--compare", default=None, help="baseline results to check against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.quick)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slower = compare(results, baseline, args.threshold)
+        for k, old, new in slower:
+            print(f"REGRESSION {k}: {old * 1e6:.1f} us -> {new * 1e6:.1f} us")
+        sys.exit(1 if slower else 0)
@@ -0,0 +1,273 @@
+"""The board keeps track of what is where, so nobody has to scan lists to find out."""
+import itertools
+from collections import defaultdict
+
+import numpy as np
+
+import journal
+
+# Terrain codes. These double as the digits print_board shows for bare terrain.
+FLOOR = 0
+ENTRANCE = 1
+WALL = 8
+EXIT = 9
+
+# Every entity gets a unique id. 0 means "nothing here" on the board layers.
+_ids = itertools.count(1)
+# Terrain versions are never reused, not even by copies or rolled back boards, so a cache
+# keyed on one always means the same terrain.
+_versions = itertools.count(1)
+
+
+class Entity:
+    """Something with a position that a board can keep track of.
+
+    Subclasses set `layer` to the name of the board layer they live on, and declare
+    __slots__ for whatever per-instance state they add."""
+    __slots__ = ("eid", "board", "_pos")
+    layer = None
+
+    def __init__(self):
+        self.eid = next(_ids)
+        self.board = None
+        self._pos = None
+
+    @property
+    def pos(self):
+        return self._pos
+
+    @pos.setter
+    def pos(self, new_pos):
+        if self.board is None:
+            journal.attr(self, "_pos")
+            self._pos = new_pos
+        else:
+            self.board.move(self, new_pos)
+
+
+class Board:
+    """Integer layers for terrain, occupant ids and floor item ids.
+
+    Entities that share a cell (which the game tries to avoid) are buried under the first
+    one to get there and resurface when it leaves.
+
+    A copy() shares the layers with its original until one of them writes, so anything
+    that writes a layer gets it through layer(name)."""
+    def __init__(self, shape=(5, 5), entrance=(4, 2), exit=(0, 2)):
+        self.terrain = np.zeros(shape, dtype=np.int8)
+        self.occupant = np.zeros(shape, dtype=np.int32)
+        self.item = np.zeros(shape, dtype=np.int32)
+        self.entrance = entrance
+        self.exit = exit
+        self.terrain[entrance] = ENTRANCE
+        self.terrain[exit] = EXIT
+        # Changes whenever terrain changes, so anything cached from it knows to recompute.
+        self.terrain_version = next(_versions)
+        self.entities = {}
+        self._buried = defaultdict(list)
+        # Cells whose contents changed since a renderer last looked (see render.py).
+        self.dirty = set()
+        # names of layers that may be shared with a copy
+        self._shared = set()
+
+    def copy(self, entities):
+        """A board with the same layers (shared until written) holding entities, a dict of
+        eid to the copies' entities."""
+        other = Board.__new__(Board)
+        other.__dict__.update(self.__dict__)
+        other.entities = entities
+        other._buried = defaultdict(list, {k: list(v) for k, v in self._buried.items()})
+        other.dirty = set()
+        self._shared = other._shared = {"terrain", "occupant", "item"}
+        return other
+
+    def layer(self, name):
+        """A layer to write to, copied first if it's still shared with another board."""
+        if name in self._shared:
+            self._shared = self._shared - {name}
+            setattr(self, name, getattr(self, name).copy())
+        return getattr(self, name)
+
+    @property
+    def shape(self):
+        return self.terrain.shape
+
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.terrain.shape[0] and 0 <= pos[1] < self.terrain.shape[1]
+
+    def set_terrain(self, pos, code):
+        """Change the terrain under pos (pos may also be a mask or slice)."""
+        terrain = self.layer("terrain")
+        journal.item(terrain, pos)
+        journal.attr(self, "terrain_version")
+        terrain[pos] = code
+        self.terrain_version = next(_versions)
+
+    def occupant_at(self, pos):
+        """The creature standing on pos, or None."""
+        return self.entities.get(int(self.occupant[pos]))
+
+    def item_at(self, pos):
+        """The floor item lying on pos, or None."""
+        return self.entities.get(int(self.item[pos]))
+
+    def place(self, entity):
+        """Start tracking an entity at its current position."""
+        if entity.board is not None and entity.board is not self:
+            entity.board.lift(entity)
+        journal.attr(entity, "board")
+        journal.item(self.entities, entity.eid)
+        entity.board = self
+        self.entities[entity.eid] = entity
+        self._put(entity, entity._pos)
+
+    def place_many(self, entities):
+        """place() every entity, in one go when they are off-board, on one layer and on
+        distinct empty cells (entity by entity otherwise, or while a journal records)."""
+        if not entities:
+            return
+        name = entities[0].layer
+        positions = [x._pos for x in entities]
+        bulk = not journal.recording() and None not in positions and len(set(positions)) == len(positions)
+        if bulk:
+            bulk = all(x.board is None and x.layer == name for x in entities)
+        if bulk:
+            rows, cols = np.array(positions).T
+            rows_n, cols_n = self.shape
+            bulk = (rows.min() >= 0 and cols.min() >= 0 and rows.max() < rows_n and cols.max() < cols_n
+                    and not getattr(self, name)[rows, cols].any())
+        if not bulk:
+            for entity in entities:
+                self.place(entity)
+            return
+        self.layer(name)[rows, cols] = [x.eid for x in entities]
+        for entity in entities:
+            entity.board = self
+        self.entities.update((x.eid, x) for x in entities)
+        self.dirty.update(positions)
+
+    def lift(self, entity):
+        """Stop tracking an entity."""
+        self._take(entity, entity._pos)
+        journal.item(self.entities, entity.eid)
+        journal.attr(entity, "board")
+        self.entities.pop(entity.eid, None)
+        entity.board = None
+
+    def move(self, entity, new_pos):
+        """Move a tracked entity. Use entity.pos = new_pos rather than calling this directly."""
+        self._take(entity, entity._pos)
+        journal.attr(entity, "_pos")
+        entity._pos = new_pos
+        self._put(entity, new_pos)
+
+    def _note(self, layer, pos, key):
+        """Journal a cell and its buried list, and mark the cell dirty again on undo."""
+        journal.note(self.dirty.add, pos)
+        journal.item(layer, pos)
+        buried = self._buried.get(key)
+        if buried is None:
+            journal.note(self._buried.pop, key, None)
+        else:
+            # a copy, the list itself changes in place
+            journal.note(self._buried.__setitem__, key, list(buried))
+
+    def _put(self, entity, pos):
+        if pos is None or not self.in_bounds(pos):
+            return
+        self.dirty.add(pos)
+        layer = self.layer(entity.layer)
+        if journal.recording():
+            self._note(layer, pos, (entity.layer, pos))
+        if layer[pos]:
+            self._buried[(entity.layer, pos)].append(entity.eid)
+        else:
+            layer[pos] = entity.eid
+
+    def _take(self, entity, pos):
+        if pos is None or not self.in_bounds(pos):
+            return
+        self.dirty.add(pos)
+        layer = self.layer(entity.layer)
+        if journal.recording():
+            self._note(layer, pos, (entity.layer, pos))
+        buried = self._buried.get((entity.layer, pos))
+        if layer[pos] == entity.eid:
+            layer[pos] = buried.pop(0) if buried else 0
+        elif buried and entity.eid in buried:
+            buried.remove(entity.eid)
+        if buried is not None and not buried:
+            del self._buried[(entity.layer, pos)]
+
+
+class EntityList(list):
+    """A list of entities that keeps its board (and optionally a CreatureStore) in step
+    with its contents. on_add, if given, is called with every entity added."""
+    def __init__(self, board, entities=(), store=None, on_add=None):
+        super().__init__()
+        self.board = board
+        self.store = store
+        self.on_add = on_add
+        self.extend(entities)
+
+    def _track(self, entity):
+        if self.store is not None:
+            self.store.add(entity)
+        self.board.place(entity)
+        if self.on_add is not None:
+            self.on_add(entity)
+
+    def _untrack(self, entity):
+        self.board.lift(entity)
+        if self.store is not None:
+            self.store.remove(entity)
+
+    def append(self, entity):
+        journal.keep(self)
+        super().append(entity)
+        self._track(entity)
+
+    def insert(self, index, entity):
+        journal.keep(self)
+        super().insert(index, entity)
+        self._track(entity)
+
+    def extend(self, entities):
+        entities = list(entities)
+        journal.keep(self)
+        if self.store is not None:
+            for entity in entities:
+                self.store.add(entity)
+        self.board.place_many(entities)
+        super().extend(entities)
+        if self.on_add is not None:
+            for entity in entities:
+                self.on_add(entity)
+
+    def remove(self, entity):
+        journal.keep(self)
+        super().remove(entity)
+        self._untrack(entity)
+
+    def pop(self, index=-1):
+        journal.keep(self)
+        entity = super().pop(index)
+        self._untrack(entity)
+        return entity
+
+    def clear(self):
+        journal.keep(self)
+        for entity in self:
+            self._untrack(entity)
+        super().clear()
+
+    def __reduce__(self):
+        # The board and store are copied along with us, so copies and pickles must not
+        # re-place anything.
+        return (_untracked_list, (self.board, list(self), self.store, self.on_add))
+
+
+def _untracked_list(board, entities, store, on_add):
+    entity_list = EntityList(board, store=store, on_add=on_add)
+    list.extend(entity_list, entities)
+    return entity_list
@@ -0,0 +1,142 @@
+"""Work out fights without playing them.
+
+Controller.attack is deterministic: every exchange the attacker loses defender.damage /
+attacker.armor hp and the defender loses attacker.damage / defender.armor. The defender
+dies once its hp drops below 0, the player once theirs reaches 0. So how a fight goes
+between two stat lines (the player attacking until one of them dies) is a closed form, and
+solve() works it out for whole arrays of them at once.
+
+Run from the linux command line:
+python3 combat.py --out matchups.npz
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+import creatures as c
+import gear as g
+
+# winner codes
+NOBODY = 0
+ATTACKER = 1
+DEFENDER = 2
+BOTH = 3
+
+# rounds when the fight never ends (somebody does no damage)
+NEVER = np.iinfo(np.int64).max
+
+stats = np.dtype([("hp", "<f8"), ("damage", "<f8"), ("armor", "<f8")])
+
+
+def rounds_to_kill(hp, hit, strict):
+    """Exchanges until hp - rounds * hit reaches 0 (drops below 0 if strict), or NEVER."""
+    hp, hit = np.broadcast_arrays(hp, hit)
+    rounds = np.full(hp.shape, NEVER, dtype=np.int64)
+    hurt = hit > 0
+    ratio = hp[hurt] / hit[hurt]
+    rounds[hurt] = np.floor(ratio) + 1 if strict else np.maximum(np.ceil(ratio), 1)
+    return rounds
+
+
+def solve(attacker, defender):
+    """Outcome of the attacker fighting the defender, for arrays of stats (which broadcast
+    against each other). Returns a dict of arrays: rounds fought, winner, and the hp both
+    sides are left with."""
+    a_hit = defender["damage"] / attacker["armor"]
+    d_hit = attacker["damage"] / defender["armor"]
+    a_rounds = rounds_to_kill(attacker["hp"], a_hit, strict=False)
+    d_rounds = rounds_to_kill(defender["hp"], d_hit, strict=True)
+    rounds = np.minimum(a_rounds, d_rounds)
+
+    winner = np.where(d_rounds < a_rounds, ATTACKER, DEFENDER).astype(np.int8)
+    winner[a_rounds == d_rounds] = BOTH
+    winner[rounds == NEVER] = NOBODY
+    fought = np.where(rounds == NEVER, 0, rounds)
+    return {
+        "rounds": rounds,
+        "winner": winner,
+        "attacker_hp": attacker["hp"] - fought * a_hit,
+        "defender_hp": defender["hp"] - fought * d_hit,
+    }
+
+
+def loadouts(gear=g.gear_list):
+    """Every way to equip the given gear, at most one piece per slot.
+    Returns (names, bonuses) with bonuses a (damage, armor) row per loadout."""
+    slots = {}
+    for gear_type in gear:
+        if gear_type.attaches and gear_type.attaches != g.Attaches.noeq:
+            slots.setdefault(gear_type.attaches, [None]).append(gear_type)
+    names = []
+    bonuses = []
+    for combo in itertools.product(*slots.values()):
+        worn = [x for x in combo if x is not None]
+        names.append("+".join(x.name for x in worn) or "nothing")
+        bonuses.append((sum(x.damage for x in worn), sum(x.armor for x in worn)))
+    return names, np.array(bonuses, dtype=np.float64).reshape(-1, 2)
+
+
+def spawn_stats(types=c.spawn_list):
+    """(names, stats) of a fresh creature of each type."""
+    spawns = [creature_type() for creature_type in types]
+    table = np.array([(x.hp, x.damage, x.armor) for x in spawns], dtype=stats)
+    return [type(x).__name__ for x in spawns], table
+
+
+def build_tables(hps=np.arange(1, 11), gear=g.gear_list, types=c.spawn_list):
+    """Lookup tables for the player, at every hp in hps and every gear loadout, attacking
+    every creature type. Result arrays are indexed [loadout, hp, creature]."""
+    player = c.Player()
+    names, bonuses = loadouts(gear)
+    attacker = np.zeros((len(names), len(hps), 1), dtype=stats)
+    attacker["hp"] = np.asarray(hps, dtype=np.float64)[None, :, None]
+    attacker["damage"] = player.base_damage + bonuses[:, 0, None, None]
+    attacker["armor"] = player.base_armor + bonuses[:, 1, None, None]
+    creature_names, defender = spawn_stats(types)
+    tables = solve(attacker, defender[None, None, :])
+    tables["loadouts"] = np.array(names)
+    tables["hp"] = np.asarray(hps)
+    tables["creatures"] = np.array(creature_names)
+    return tables
+
+
+def save(path, tables):
+    np.savez_compressed(path, **tables)
+
+
+def load(path):
+    with np.load(path) as f:
+        return dict(f)
+
+
+def lookup(tables, loadout, hp, creature):
+    """The outcome of one matchup, from tables made by build_tables. Only tabulated hps can
+    be looked up, anything else is a ValueError."""
+    i = list(tables["loadouts"]).index(loadout)
+    hps = tables["hp"]
+    j = int(np.searchsorted(hps, hp))
+    if j == len(hps) or hps[j] != hp:
+        raise ValueError(f"No matchups for hp {hp}, the tables have hp {hps[0]} to {hps[-1]}.")
+    k = list(tables["creatures"]).index(creature)
+    return {x: tables[x][i, j, k].item() for x in ("rounds", "winner", "attacker_hp", "defender_hp")}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tabulate fight outcomes for every loadout.")
+    parser.add_argument("--out", default="matchups.npz")
+    parser.add_argument("--max-hp", type=int, default=100)
+    parser.add_argument("--all-creatures", action="store_true", help="not just the ones that spawn")
+    args = parser.parse_args()
+
+    types = c.creature_types if args.all_creatures else c.spawn_list
+    start = time.perf_counter()
+    tables = build_tables(np.arange(1, args.max_hp + 1), types=types)
+    elapsed = time.perf_counter() - start
+    save(args.out, tables)
+    print(f"{tables['winner'].size} matchups in {elapsed * 1000:.1f} ms, written to {args.out}")
+    wins = (tables["winner"] == ATTACKER).mean(axis=1)
+    print(f"{'player wins against':40}" + "".join(f"{x:>8}" for x in tables["creatures"]))
+    for name, row in zip(tables["loadouts"], wins):
+        print(f"{name:40}" + "".join(f"{x:8.0%}" for x in row))
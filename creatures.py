@@ -1,42 +1,151 @@
-class Creature:
+from board import Entity
+import journal
+import store
+
+
+def _stat(name):
+    """A stat that lives on the creature, or in its CreatureStore slot when it has one."""
+    local = "_" + name
+
+    def get(self):
+        if self._store is None:
+            return getattr(self, local)
+        return float(getattr(self._store, name)[self._slot])
+
+    def set(self, value):
+        if self._store is None:
+            journal.attr(self, local)
+            setattr(self, local, value)
+        else:
+            journal.item(getattr(self._store, name), self._slot)
+            getattr(self._store, name)[self._slot] = value
+
+    return property(get, set)
+
+
+# The totals of derived stats, cached where _stat keeps them. Only refresh() writes these.
+_totals = {name: _stat(name) for name in ("damage", "armor")}
+
+
+def _derived(name):
+    """A stat worth base_<name> plus what the creature's modifiers add. Reading it is just
+    reading the cached total. Setting it moves the base so the total comes out as given."""
+    total = _totals[name]
+    base = "base_" + name
+
+    def set(self, value):
+        journal.attr(self, base)
+        setattr(self, base, value - sum(getattr(x, name) for x in self.modifiers()))
+        total.fset(self, value)
+
+    return property(total.fget, set)
+
+
+class Creature(Entity):
+    __slots__ = ("_store", "_slot", "_hp", "_damage", "_armor", "_aggressive", "score",
+                 "base_damage", "base_armor", "effects")
+    layer = "occupant"
+    repr = "C"
+    # actions per turn (see scheduler.py)
+    speed = 1.0
+    hp = _stat("hp")
+    damage = _derived("damage")
+    armor = _derived("armor")
+
     def __init__(self):
+        self._store = None
+        self._slot = None
+        # running effects.Effect, see effects.Timers. One shared empty tuple until the first
+        # effect, most creatures never get one.
+        self.effects = ()
+        super().__init__()
         self.aggressive = False
         self.damage = 3
         self.armor = 2
         self.hp = 10
-        self.repr = "C"
         self.pos = (4,2)
         self.score = 0
 
+    @property
+    def aggressive(self):
+        if self._store is None:
+            return self._aggressive
+        return bool(self._store.flags[self._slot] & store.AGGRESSIVE)
+
+    @aggressive.setter
+    def aggressive(self, value):
+        if self._store is None:
+            journal.attr(self, "_aggressive")
+            self._aggressive = value
+            return
+        journal.item(self._store.flags, self._slot)
+        if value:
+            self._store.flags[self._slot] |= store.AGGRESSIVE
+        else:
+            self._store.flags[self._slot] &= ~store.AGGRESSIVE & 0xFF
+
+    @Entity.pos.setter
+    def pos(self, new_pos):
+        Entity.pos.fset(self, new_pos)
+        if self._store is not None and new_pos is not None:
+            journal.item(self._store.row, self._slot)
+            journal.item(self._store.col, self._slot)
+            self._store.row[self._slot], self._store.col[self._slot] = new_pos
+
+    def modifiers(self):
+        """Everything adding to this creature's damage and armor."""
+        return self.effects
+
+    def refresh(self):
+        """Recompute damage and armor, after equipment or effects changed."""
+        modifiers = self.modifiers()
+        for name, total in _totals.items():
+            total.fset(self, getattr(self, "base_" + name) + sum(getattr(x, name) for x in modifiers))
+
     def __repr__(self):
         return self.repr
 
 
 class Goblin(Creature):
     """A weak creature, but aggressive."""
+    __slots__ = ()
+    repr = "G"
+
     def __init__(self):
         super().__init__()
         self.aggressive = True
-        self.repr = "G"
 
 class Troll(Creature):
     """A tough creature, but not aggressive."""
+    __slots__ = ()
+    repr = "T"
+
     def __init__(self):
         super().__init__()
-        self.repr = "T"
         self.hp = 30
         self.damage = 6
         self.armor = 4
 
 class Player(Creature):
+    __slots__ = ("name", "items", "equipment")
+    repr = "P"
+
     def __init__(self):
+        # before Creature sets the stats, equipment counts toward them
+        self.items = []
+        self.equipment = []
         super().__init__()
-        self.repr = "P"
         self.name = "Markemus"
         self.hp = 10
         self.score = 0
-        self.items = []
-        self.equipment = []
+
+    def modifiers(self):
+        return self.equipment + list(self.effects)
+
+# Every creature type, indexed by type_id. Only append to this list, saved type ids depend on it.
+creature_types = [Creature, Goblin, Troll, Player]
+for type_id, creature_type in enumerate(creature_types):
+    creature_type.type_id = type_id
 
 # TODO fix troll spawns to work with tests (mock the list so they won't spawn then)
 # spawn_list = [Goblin, Troll]
@@ -2,4 +2,14 @@
 
 # TODO-DECIDE more custom exceptions to aid readability in the failures? or use return values instead?
 class DeathError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class SaveError(Exception):
+    """A save file that can't be loaded."""
+    pass
+
+
+class PlacementError(Exception):
+    """More things to place than there are free cells."""
+    pass
@@ -0,0 +1,85 @@
+"""A dungeon of rooms, one per level, that the player can walk back and forth through.
+
+Taking the exit goes down a level, stepping back onto the entrance goes back up. Rooms the
+player hasn't seen come from a levels.LevelCache (so they are built ahead of time and the
+same for the same seed). Rooms the player left stay in memory for a while, the least
+recently visited ones beyond `resident` are written to disk with savegame.dumps_room and
+read back if the player returns. Memory depends on `resident`, not on how far the player
+has gone.
+"""
+import collections
+import os
+import shutil
+import tempfile
+
+import savegame
+
+
+class Dungeon:
+    def __init__(self, levels, resident=3, directory=None):
+        self.levels = levels
+        self.resident = resident
+        # level -> (board, creatures, floor items), least recently left first
+        self.rooms = collections.OrderedDict()
+        # levels whose rooms are on disk
+        self.evicted = set()
+        self.directory = directory or tempfile.mkdtemp(prefix="simplerpg-rooms-")
+        self.loads = 0
+        self.evictions = 0
+
+    def path(self, level):
+        return os.path.join(self.directory, f"room{level}.srpg")
+
+    def leave(self, model):
+        """Take the current room off model and keep it, evicting old rooms if need be."""
+        creatures = [x for x in model.creatures if x is not model.player]
+        for creature in creatures:
+            model.creatures.remove(creature)
+        floor_items = list(model.floor_items)
+        model.floor_items.clear()
+        self.rooms[model.level] = (model.board, creatures, floor_items)
+        while len(self.rooms) > self.resident:
+            level, room = self.rooms.popitem(last=False)
+            with open(self.path(level), "wb") as f:
+                f.write(savegame.dumps_room(*room))
+            self.evicted.add(level)
+            self.evictions += 1
+
+    def room(self, level):
+        """(board, creatures, floor items) of a level: kept, evicted or brand new."""
+        if level in self.rooms:
+            return self.rooms.pop(level)
+        if level in self.evicted:
+            self.evicted.remove(level)
+            self.loads += 1
+            with open(self.path(level), "rb") as f:
+                room = savegame.loads_room(f.read())
+            os.remove(self.path(level))
+            return room
+        board, creatures = self.levels.take(level)
+        return board, creatures, []
+
+    def travel(self, model, level):
+        """Move the player to level. Going back up, they arrive on that room's exit."""
+        up = level < model.level
+        # fetch first, so leaving can't evict the room we're going to
+        board, creatures, floor_items = self.room(level)
+        self.leave(model)
+        model.reset_board(board)
+        model.level = level
+        if up:
+            model.player.pos = board.exit
+        for creature in creatures:
+            model.add_creature(creature)
+        model.floor_items.extend(floor_items)
+
+    def forget(self):
+        """Drop every room (say, after loading a saved game)."""
+        self.rooms.clear()
+        for level in self.evicted:
+            os.remove(self.path(level))
+        self.evicted.clear()
+
+    def close(self):
+        self.forget()
+        shutil.rmtree(self.directory, ignore_errors=True)
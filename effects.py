@@ -0,0 +1,63 @@
+"""Status effects that wear off: a heap of (expiry turn, effect), so a turn only looks at
+the effects that end on it, however many are still running."""
+import heapq
+import itertools
+
+import journal
+
+
+class Effect:
+    """A temporary bonus to a creature's damage and armor."""
+    __slots__ = ("name", "damage", "armor")
+
+    def __init__(self, name, damage=0, armor=0):
+        self.name = name
+        self.damage = damage
+        self.armor = armor
+
+    def __repr__(self):
+        return self.name
+
+
+class Timers:
+    """Every running effect in the game, keyed by the turn it expires."""
+    def __init__(self):
+        self.heap = []
+        # effects expiring on the same turn end in the order they started
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def copy(self, copies):
+        """A copy for copied creatures (copies maps id(creature) to its copy). Effects on
+        creatures that weren't copied are left out."""
+        other = Timers()
+        other.heap = [(t, seq, copies[id(x)], e) for t, seq, x, e in self.heap if id(x) in copies]
+        heapq.heapify(other.heap)
+        other._seq = itertools.count(next(self._seq))
+        return other
+
+    def add(self, creature, effect, expires):
+        """Start an effect on a creature, until turn `expires`."""
+        if not creature.effects:
+            # the shared empty tuple (or a list emptied by expire)
+            journal.attr(creature, "effects")
+            creature.effects = []
+        journal.keep(creature.effects)
+        journal.keep(self.heap)
+        creature.effects.append(effect)
+        creature.refresh()
+        heapq.heappush(self.heap, (expires, next(self._seq), creature, effect))
+
+    def expire(self, turn):
+        """End every effect due by turn. Returns them as (creature, effect)."""
+        ended = []
+        while self.heap and self.heap[0][0] <= turn:
+            journal.keep(self.heap)
+            expires, seq, creature, effect = heapq.heappop(self.heap)
+            journal.keep(creature.effects)
+            creature.effects.remove(effect)
+            creature.refresh()
+            ended.append((creature, effect))
+        return ended
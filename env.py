@@ -0,0 +1,144 @@
+"""Many games stepped side by side, for training and evaluating bots without input().
+
+    env = BatchEnv(64)
+    obs = env.reset(seed=0)
+    obs, reward, done, info = env.step(actions, items)
+
+Actions are indexes into `actions` (the Controller's command keys), items are the inventory
+or equipment index that equip/unequip/quaff use. Observations are a dict of arrays that are
+allocated once and refilled in place every step, so keep a copy of anything you want to
+hang on to. Every room of every game is `shape` cells. A game that ends (the player dies,
+reaches the Level of Fire, or takes max_steps steps) reports done and the cause in its info, and a new game takes its place.
+
+Run from the linux command line to measure throughput:
+python3 env.py --games 64 --steps 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+import board as b
+import index
+import levels
+from custom_exceptions import DeathError
+
+actions = ("w", "a", "s", "d", "e", "u", "q")
+# columns of obs["player"]
+stats = ("hp", "damage", "armor", "score", "level", "turn")
+
+
+class BatchEnv:
+    def __init__(self, n, max_steps=1000, shape=(5, 5)):
+        self.n = n
+        # steps rather than turns, equipping and quaffing take no turn but do take a step
+        self.max_steps = max_steps
+        self.shape = shape
+        # board layers hold type_id + 1 of whatever is there, 0 for nothing
+        self.obs = {
+            "terrain": np.zeros((n,) + shape, dtype=np.int8),
+            "occupant": np.zeros((n,) + shape, dtype=np.int8),
+            "item": np.zeros((n,) + shape, dtype=np.int8),
+            "player": np.zeros((n, len(stats)), dtype=np.float64),
+        }
+        self.reward = np.zeros(n, dtype=np.float64)
+        self.done = np.zeros(n, dtype=bool)
+        self.info = [{} for i in range(n)]
+        self.games = [None] * n
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.next_seed = 0
+
+    def new_game(self, i, seed):
+        """Start game i over from seed."""
+        rows, cols = self.shape
+        model = index.Model(seed=seed)
+        model.reset_board(b.Board(self.shape, (rows - 1, cols // 2), (0, cols // 2)))
+        controller = index.Controller(model, index.NullView(model=model))
+        controller.levels = levels.LevelCache(seed, ahead=0, shape=self.shape)
+        controller.start_game()
+        self.games[i] = controller
+        self.steps[i] = 0
+
+    def reset(self, seed=0):
+        """Start every game over, game i from seed + i. Returns the observations."""
+        for i in range(self.n):
+            self.new_game(i, seed + i)
+            self.observe(i)
+        self.next_seed = seed + self.n
+        self.reward[:] = 0
+        self.done[:] = False
+        return self.obs
+
+    def act(self, controller, action, item):
+        key = actions[action]
+        if key in controller.prompts:
+            show, question, answer = controller.prompts[key]
+            answer(item)
+        else:
+            controller.commands[key]()
+
+    def step(self, actions, items=None):
+        """Every game takes its action. Returns (obs, reward, done, info), reward being the
+        score and levels gained this step."""
+        for i, controller in enumerate(self.games):
+            model = controller.model
+            info = self.info[i]
+            info.clear()
+            score, level = model.player.score, model.level
+            cause = None
+            try:
+                self.act(controller, actions[i], 0 if items is None else int(items[i]))
+            except DeathError:
+                cause = "enlightened" if model.level == 10 else "killed"
+            self.steps[i] += 1
+            if cause is None and self.steps[i] >= self.max_steps:
+                cause = "timeout"
+            self.reward[i] = model.player.score - score + model.level - level
+            self.done[i] = cause is not None
+            if model.level != level:
+                info["level"] = model.level
+            if cause is not None:
+                info["cause"] = cause
+                info["score"] = model.player.score
+                info["turns"] = model.turn
+                info["steps"] = int(self.steps[i])
+                self.new_game(i, self.next_seed)
+                self.next_seed += 1
+            self.observe(i)
+        return self.obs, self.reward, self.done, self.info
+
+    def observe(self, i):
+        """Fill game i's rows of the observation arrays."""
+        model = self.games[i].model
+        np.copyto(self.obs["terrain"][i], model.board.terrain)
+        occupant = self.obs["occupant"][i]
+        occupant.fill(0)
+        for creature in model.creatures:
+            occupant[creature.pos] = creature.type_id + 1
+        item = self.obs["item"][i]
+        item.fill(0)
+        for gear in model.floor_items:
+            item[gear.pos] = gear.type_id + 1
+        player = self.obs["player"][i]
+        p = model.player
+        player[:] = p.hp, p.damage, p.armor, p.score, model.level, model.turn
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure BatchEnv throughput with random actions.")
+    parser.add_argument("--games", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+
+    env = BatchEnv(args.games)
+    env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    moves = rng.integers(0, 4, size=(args.steps, args.games))
+    finished = 0
+    start = time.perf_counter()
+    for step in range(args.steps):
+        obs, reward, done, info = env.step(moves[step])
+        finished += int(done.sum())
+    elapsed = time.perf_counter() - start
+    total = args.steps * args.games
+    print(f"{total} steps in {elapsed:.2f} s ({total / elapsed:.0f} steps/s), {finished} games finished")
@@ -0,0 +1,106 @@
+"""What can be seen from where: recursive shadowcasting over the board's terrain.
+
+Walls block sight, everything else is see-through. Each of the eight octants around the
+viewer is scanned row by row outward, and a wall only starts a new, narrower scan of the
+cells behind it, so the work is proportional to what is visible rather than to the board.
+Recursive shadowcasting isn't symmetric: around wall corners a creature can sit in a cell the
+player sees without seeing the player from it, and the other way round. The game still uses
+one field from the player to decide which creatures see the player, an approximation that is
+off only at the edges of shadows.
+"""
+import collections
+
+import numpy as np
+
+import board as b
+
+# (xx, xy, yx, yy) for each octant: how a (column offset, row offset) scan maps to the board.
+octants = [
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+]
+
+
+def _cast(opaque, visible, cy, cx, row, start, end, radius, xx, xy, yx, yy):
+    """Scan one octant from `row` outward, between slopes start and end."""
+    if start < end:
+        return
+    rows = len(opaque)
+    cols = len(opaque[0])
+    radius2 = radius * radius
+    new_start = start
+    for j in range(row, radius + 1):
+        dx, dy = -j - 1, -j
+        blocked = False
+        while dx <= 0:
+            dx += 1
+            x = cx + dx * xx + dy * xy
+            y = cy + dx * yx + dy * yy
+            left = (dx - 0.5) / (dy + 0.5)
+            right = (dx + 0.5) / (dy - 0.5)
+            if start < right:
+                continue
+            if end > left:
+                break
+            inside = 0 <= y < rows and 0 <= x < cols
+            if inside and dx * dx + dy * dy <= radius2:
+                visible[y][x] = True
+            wall = not inside or opaque[y][x]
+            if blocked:
+                if wall:
+                    new_start = right
+                    continue
+                blocked = False
+                start = new_start
+            elif wall and j < radius:
+                blocked = True
+                _cast(opaque, visible, cy, cx, j + 1, start, left, radius, xx, xy, yx, yy)
+                new_start = right
+        if blocked:
+            break
+
+
+def field_of_view(terrain, pos, radius):
+    """Boolean array of the cells visible from pos, at most radius cells away (as the crow
+    flies). The viewer's own cell and the walls bounding the view count as visible."""
+    visible = np.zeros(terrain.shape, dtype=bool)
+    # only the square the radius can reach matters
+    top = max(pos[0] - radius, 0)
+    left = max(pos[1] - radius, 0)
+    window = terrain[top:pos[0] + radius + 1, left:pos[1] + radius + 1]
+    opaque = (window == b.WALL).tolist()
+    seen = [[False] * window.shape[1] for row in range(window.shape[0])]
+    cy, cx = pos[0] - top, pos[1] - left
+    seen[cy][cx] = True
+    for xx, xy, yx, yy in octants:
+        _cast(opaque, seen, cy, cx, 1, 1.0, 0.0, radius, xx, xy, yx, yy)
+    visible[top:top + window.shape[0], left:left + window.shape[1]] = seen
+    return visible
+
+
+class FieldOfView:
+    """Fields of view cached by (position, terrain version), for one board at a time.
+    A few recent positions are kept, so pacing back and forth costs nothing."""
+    def __init__(self, radius=10, size=64):
+        self.radius = radius
+        self.size = size
+        self.board = None
+        self.cache = collections.OrderedDict()
+        self.computed = 0
+
+    def visible(self, board, pos):
+        """The (cached) field of view from pos on board. Don't modify it."""
+        if board is not self.board:
+            self.board = board
+            self.cache.clear()
+        key = (pos, board.terrain_version)
+        field = self.cache.get(key)
+        if field is None:
+            field = field_of_view(board.terrain, pos, self.radius)
+            self.computed += 1
+            self.cache[key] = field
+            if len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return field
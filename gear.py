@@ -1,4 +1,9 @@
 from enum import Enum, auto
+
+import effects
+from board import Entity
+
+
 class Attaches(Enum):
     head = "head"
     body = "body"
@@ -8,82 +13,80 @@ class Attaches(Enum):
     noeq = "no_equip"
 
 
-class Gear:
-    def __init__(self):
-        self.name = "gear"
-        self.damage = 0
-        self.armor = 0
-        self.pos = None
-        self.attaches = False
-        self.usable = False
+class Gear(Entity):
+    """A piece of gear. Each gear type is a shared prototype: its name, damage, armor and
+    slot live on the class, and instances only carry their own position."""
+    __slots__ = ()
+    layer = "item"
+    name = "gear"
+    damage = 0
+    armor = 0
+    attaches = False
+    usable = False
 
     def __repr__(self):
         return "i"
 
 
 class TestWeapon(Gear):
-    def __init__(self):
-        super().__init__()
-        self.attaches = Attaches.test
-        self.name = "test_weapon"
+    __slots__ = ()
+    attaches = Attaches.test
+    name = "test_weapon"
 
 
 class Sword(Gear):
-    def __init__(self):
-        super().__init__()
-        self.damage = 5
-        self.name = "sword"
-        self.attaches = Attaches.r_hand
+    __slots__ = ()
+    damage = 5
+    name = "sword"
+    attaches = Attaches.r_hand
 
     def __repr__(self):
         return "s"
 
 class Spear(Gear):
-    def __init__(self):
-        super().__init__()
-        self.name = "spear"
-        self.damage = 3
-        self.attaches = Attaches.r_hand
+    __slots__ = ()
+    name = "spear"
+    damage = 3
+    attaches = Attaches.r_hand
 
     def __repr__(self):
         return "|"
 
 class Shield(Gear):
-    def __init__(self):
-        super().__init__()
-        self.armor = 5
-        self.name = "shield"
-        self.attaches = Attaches.l_hand
+    __slots__ = ()
+    armor = 5
+    name = "shield"
+    attaches = Attaches.l_hand
 
     def __repr__(self):
         return "b"
 
 class Helm(Gear):
-    def __init__(self):
-        super().__init__()
-        self.armor = 5
-        self.name = "helmet"
-        self.attaches = Attaches.head
+    __slots__ = ()
+    armor = 5
+    name = "helmet"
+    attaches = Attaches.head
 
     def __repr__(self):
         return "h"
 
 class Breastplate(Gear):
-    def __init__(self):
-        super().__init__()
-        self.armor = 5
-        self.name = "breastplate"
-        self.attaches = Attaches.body
+    __slots__ = ()
+    armor = 5
+    name = "breastplate"
+    attaches = Attaches.body
 
     def __repr__(self):
         return "a"
 
 
 class Potion(Gear):
+    __slots__ = ("turntimer",)
+    name = "potion"
+    usable = True
+
     def __init__(self):
         super().__init__()
-        self.name = "potion"
-        self.usable = True
         # Will expire immediately
         self.turntimer = 0
 
@@ -91,16 +94,38 @@ class Potion(Gear):
         """This effect occurs when potion is taken."""
         pass
 
+    def effect(self):
+        """The effect that lasts turntimer turns after the potion is taken, if any."""
+        return None
+
 
 class HealthPotion(Potion):
-    def __init__(self):
-        super().__init__()
-        self.name = "Potion of Health"
-        self.attaches = Attaches.noeq
+    __slots__ = ()
+    name = "Potion of Health"
+    attaches = Attaches.noeq
 
     def take_effect(self, creature):
         creature.hp += 10
 
 
+class StrengthPotion(Potion):
+    __slots__ = ()
+    name = "Potion of Strength"
+    attaches = Attaches.noeq
+
+    def __init__(self):
+        super().__init__()
+        self.turntimer = 10
+
+    def effect(self):
+        return effects.Effect("strength", damage=5)
+
+
+# Every gear type, indexed by type_id. Only append to this list, saved type ids depend on it.
+gear_types = [Gear, TestWeapon, Sword, Spear, Shield, Helm, Breastplate, Potion, HealthPotion,
+             StrengthPotion]
+for type_id, gear_type in enumerate(gear_types):
+    gear_type.type_id = type_id
+
 # This gear can spawn
-gear_list = [Sword, Shield, Helm, Breastplate, HealthPotion]
\ No newline at end of file
+gear_list = [Sword, Shield, Helm, Breastplate, HealthPotion]
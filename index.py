@@ -1,37 +1,103 @@
 """A simple rpg. No pressure."""
 import copy
-import datetime
-import random
+import sys
 
 import numpy as np
-import pandas as pd
 
+import board as b
 import creatures as c
+import effects as fx
+import fov as fv
 import gear as g
+import journal
+import pathfinding as pf
+import placement
+import rng as rn
+import savegame
+import scheduler as sch
+import store as st
 from custom_exceptions import *
 
-# Globals
-DEBUG = False
-
-
 class Model:
     """Model should include all the data for the game."""
-    def __init__(self):
+    def __init__(self, store=False, seed=None):
         self.turn = 0
         self.level = 1
+        # Every random draw the game makes, in named streams seeded from seed.
+        self.rng = rn.Rng(seed)
         self.player = c.Player()
-        # TODO potions have an expiry turn
+        # Every running status effect, by the turn it wears off.
+        self.effects = fx.Timers()
+        # Keep creature stats in a CreatureStore so aggressive creatures act in one batch.
+        self.use_store = store
         self.reset_board()
 
     def add_creature(self, creature):
         self.creatures.append(creature)
 
-    def reset_board(self):
-        """Remove all creatures except player (reset room)."""
-        self.creatures = [self.player]
-        self.board = np.zeros((5, 5), dtype=object)
-        self.floor_items = []
-        self.player.pos = (4,2)
+    def reset_board(self, board=None):
+        """Remove all creatures except player (reset room). Optionally use the given (empty) board."""
+        self.board = board if board is not None else b.Board()
+        self.store = st.CreatureStore() if self.use_store else None
+        self.scheduler = sch.Scheduler(now=self.turn)
+        self.creatures = b.EntityList(self.board, [self.player], store=self.store, on_add=self.scheduler.add)
+        self.floor_items = b.EntityList(self.board)
+        self.player.pos = self.board.entrance
+
+    def checkpoint(self):
+        """Start recording changes (see journal.py) and return a point to rollback() to.
+        Checkpoints nest, rolling back to one forgets the ones made after it."""
+        journal.start()
+        return journal.mark(), dict(vars(self)), self.rng.getstate()
+
+    def rollback(self, checkpoint):
+        """Put the game (random streams included) back the way it was at checkpoint.
+        The checkpoint can be rolled back to again."""
+        position, state, rng_state = checkpoint
+        journal.undo(position)
+        vars(self).update(state)
+        self.rng.setstate(rng_state)
+
+    def commit(self):
+        """Stop recording and keep every change since the checkpoints."""
+        journal.stop()
+
+    def clone(self):
+        """An independent copy of the game. Entities are copied one level deep (their stats
+        are plain values) and the board layers are shared until either game writes to them,
+        which makes this much cheaper than copy.deepcopy. It is still linear in the number of
+        entities, every one is copied: about 80 us for a starting room, 3 ms with a thousand
+        creatures (bench_clone.py --size). Searches over big rooms should checkpoint() and
+        rollback() instead, which only pay for what a move changed."""
+        other = Model.__new__(Model)
+        vars(other).update(vars(self))
+        copies = {}
+
+        def dup(entity):
+            twin = copies[id(entity)] = copy.copy(entity)
+            return twin
+
+        player = dup(self.player)
+        player.items = [dup(x) for x in self.player.items]
+        player.equipment = [dup(x) for x in self.player.equipment]
+        creatures = [player] + [dup(x) for x in self.creatures if x is not self.player]
+        floor_items = [dup(x) for x in self.floor_items]
+        for creature in creatures:
+            if creature.effects:
+                creature.effects = list(creature.effects)
+
+        other.board = self.board.copy({eid: copies[id(x)] for eid, x in self.board.entities.items()})
+        for entity in creatures + floor_items:
+            if entity.board is self.board:
+                entity.board = other.board
+        other.store = self.store.copy(copies) if self.store is not None else None
+        other.scheduler = self.scheduler.copy(copies)
+        other.effects = self.effects.copy(copies)
+        other.player = player
+        other.rng = self.rng.copy()
+        other.creatures = b._untracked_list(other.board, creatures, other.store, other.scheduler.add)
+        other.floor_items = b._untracked_list(other.board, floor_items, None, None)
+        return other
 
 
 class Controller:
@@ -39,6 +105,25 @@ class Controller:
     def __init__(self, model, view):
         self.model = model
         self.view = view
+        # Shared distance field for everything chasing the same goal (usually the player).
+        self.paths = pf.FlowField()
+        # What the player can see, also taken as who can see the player (an approximation,
+        # see fov.py). Creatures only chase the player from cells in it.
+        self.fov = fv.FieldOfView()
+        # scores.ScoreStore, opened at the first game over so startup doesn't pay for it.
+        self.scores = None
+        # instrument.TurnProfiler when profiling is on (index.py --profile), else None.
+        self.profiler = None
+        # telemetry.Telemetry streaming structured game events to disk (index.py --telemetry), else None.
+        self.telemetry = None
+        # replaylog.Recorder that keeps every answer the player gives, if the game is being recorded.
+        self.recorder = None
+        # levels.LevelCache building upcoming levels from the game's seed, else levels are
+        # rolled from the model's rng when they are reached.
+        self.levels = None
+        # dungeon.Dungeon keeping the rooms already visited, so the player can go back up.
+        # Without one, every level is a fresh room and the old one is gone.
+        self.dungeon = None
         self.commands = {
             "w": lambda: self.round("w"),
             "a": lambda: self.round("a"),
@@ -49,6 +134,10 @@ class Controller:
             "e": self.equip_cmd,
             "u": self.unequip_cmd,
             "q": self.quaff_cmd,
+            "save": self.save_cmd,
+            "load": self.load_cmd,
+            "stats": self.stats_cmd,
+            "dump": self.dump_cmd,
         }
         self.descriptions = {
             "w": "walk forward",
@@ -60,62 +149,127 @@ class Controller:
             "e": "equip an item",
             "u": "unequip an item",
             "q": "quaff a potion",
+            "save": "save the game",
+            "load": "load the saved game",
+            "stats": "show turn timings (with --profile)",
+            "dump": "write turn timings to a file (with --profile)",
+        }
+        # Commands that ask a follow up question: what to show, what to ask, and what to do
+        # with the answer. interface() asks right away, a server session waits for the next line.
+        self.prompts = {
+            "e": (self.show_inventory, "Which item would you like to equip?", self.equip_answer),
+            "u": (self.show_equipment, "Which item would you like to remove?", self.unequip_answer),
+            "q": (self.show_inventory, "Which item would you like to quaff?", self.quaff_answer),
         }
 
 
+    def ask(self, prompt):
+        """Ask the player something. Answers go to the replay log when there is one."""
+        self.view.flush()
+        answer = input(prompt)
+        if self.recorder is not None:
+            self.recorder.record(answer)
+        return answer
+
     def interface(self):
-        name = input("Name your character:")
+        name = self.ask("Name your character:")
         if name: self.model.player.name = name
 
         endgame = False
         while not endgame:
-            command = input("\nChoose an action or 'help':")
-            if command == "help":
-                # Help output is updated somewhat manually. Don't forget!
-                for key, val in self.commands.items():
-                    print(f"{key}: {self.descriptions[key]}")
-                print("help")
-                print("exit")
-
-            elif command in self.commands.keys():
-                # Run command and catch if player dies.
-                try:
-                    self.commands[command]()
-                except DeathError as e:
-                    print(e)
-                    self.view.print(f"\nscore:{self.model.player.score}\nYou must begin a new game. Exiting...")
-                    endgame = True
-            elif command == "exit":
-                endgame = True
-            else:
-                self.view.print("Command not recognized.")
-            self.view.print_board()
+            command = self.ask("\nChoose an action or 'help':")
+            if command in self.prompts:
+                # Commands that need a follow up answer from the player.
+                show, question, answer = self.prompts[command]
+                show()
+                answer(self.ask(question))
+                command = None
+            endgame = self.handle(command)
         else:
             # game over, save score
-            high_scores = pd.read_csv("high_scores.tsv", sep="\t")
-            new_row = (self.model.player.score, self.model.player.name, datetime.date.today())
-            high_scores.loc[4] = new_row
-            high_scores = high_scores.sort_values(by="score", ascending=False).iloc[:3]
-            high_scores.to_csv("high_scores.tsv", sep="\t", index=False)
-            self.view.print(high_scores)
-
-    def create_creature(self):
-        """Create a Creature and assign it a position."""
-        creature = random.choice(c.spawn_list)()
-
-        # ensure unique positions
-        while creature.pos in [x.pos for x in self.model.creatures]:
-            if DEBUG: print(f"Whiling creature.pos: {creature.pos}")
-            creature.pos = (np.random.randint(0, self.model.board.shape[0]), np.random.randint(0, self.model.board.shape[1]))
+            self.save_score()
+
+    def handle(self, command):
+        """Run one command the player typed, then show the board. Returns True when the game is over.
+        A command of None just shows the board."""
+        endgame = False
+        prof = self.profiler
+        # only a command that played a turn gets its render timed, on that turn's row
+        turns = prof.turns if prof else 0
+        if command is None:
+            pass
+        elif command == "help":
+            # Help output is updated somewhat manually. Don't forget!
+            for key, val in self.commands.items():
+                self.view.print(f"{key}: {self.descriptions[key]}")
+            self.view.print("help")
+            self.view.print("exit")
+
+        elif command in self.commands.keys():
+            # Run command and catch if player dies.
+            try:
+                self.commands[command]()
+            except DeathError as e:
+                if self.telemetry:
+                    self.game_over_event("enlightened" if self.model.level == 10 else "killed")
+                self.view.print(e)
+                self.view.print(f"\nscore:{self.model.player.score}\nYou must begin a new game. Exiting...")
+                endgame = True
+        elif command == "exit":
+            if self.telemetry:
+                self.game_over_event("quit")
+            endgame = True
+        else:
+            self.view.print("Command not recognized.")
+        timed = prof and prof.turns != turns
+        if timed: prof.tick()
+        self.view.print_board()
+        self.view.flush()
+        if timed: prof.lap("render")
+        return endgame
+
+    def game_over_event(self, cause):
+        player = self.model.player
+        self.telemetry.emit("game_over", self.model.turn, cause=cause, score=player.score,
+                            level=self.model.level, hp=player.hp)
+
+    def save_score(self):
+        """Record the player's score and show the high score table."""
+        if self.scores is None:
+            import scores
+            self.scores = scores.ScoreStore()
+        self.scores.add(self.model.player.score, self.model.player.name)
+        self.view.print(self.scores.format_top())
+        self.view.flush()
+
+    def start_game(self):
+        """Populate the first room and hand the player their starting gear."""
+        self.populate_room()
+        sword = g.Sword()
+        shield = g.Shield()
+        self.model.player.items.append(sword)
+        self.model.player.items.append(shield)
+        self.equip(self.model.player, sword)
+        self.equip(self.model.player, shield)
+
+    def create_creature(self, pos=None):
+        """Create a Creature on a free cell (or on pos)."""
+        rng = self.model.rng
+        creature = rng.spawning.choice(c.spawn_list)()
+        creature.pos = pos if pos is not None else placement.sample(self.model.board, 1, rng.placement.generator)[0]
         self.model.add_creature(creature)
 
-    def populate_room(self):
-        """Generate a random number of creatures."""
-        min = 3
-        max = 7
-        n = random.randint(min, max)
-        for c in range(1, n+1):
-            self.create_creature()
+    def populate_room(self, density=None):
+        """Generate a random number of creatures, or enough to fill density of the free cells."""
+        if density is None:
+            min = 3
+            max = 7
+            n = self.model.rng.spawning.randint(min, max)
+        else:
+            n = placement.for_density(self.model.board, density)
+        # every position in one draw, so a crowded room costs no retries
+        for pos in placement.sample(self.model.board, n, self.model.rng.placement.generator):
+            self.create_creature(pos)
 
     def move(self, creature, wasd):
         """Move a creature one tile in any direction."""
@@ -128,23 +282,41 @@ class Controller:
         # Move
         move = moves[wasd]
         new_pos = (creature.pos[0] + move[0], creature.pos[1] + move[1])
+        board = self.model.board
+        if not board.in_bounds(new_pos) or board.terrain[new_pos] == b.WALL:
+            self.view.print("Invalid move.")
         # attack if position is occupied (and don't move)
-        if new_pos in [x.pos for x in self.model.creatures]:
-            other_creature = self.model.creatures[[x.pos for x in self.model.creatures].index(new_pos)]
-            self.attack(creature, other_creature)
+        elif board.occupant[new_pos]:
+            self.attack(creature, board.occupant_at(new_pos))
         # move instead of attacking
-        elif (new_pos[0] >= 0 and new_pos[1] >= 0) and (new_pos[0] <= self.model.board.shape[0] - 1 and new_pos[1] <= self.model.board.shape[1] - 1):
+        else:
             creature.pos = new_pos
+            if self.telemetry:
+                self.telemetry.emit("move", self.model.turn, eid=creature.eid, pos=new_pos)
             # Exit if on exit
-            if (creature == self.model.player) and creature.pos == (0, 2):
+            if (creature == self.model.player) and board.terrain[new_pos] == b.EXIT:
                 self.new_level()
-        else:
-            self.view.print("Invalid move.")
+            # Back up a level through the entrance, if there is a dungeon to go back to
+            elif (creature == self.model.player and board.terrain[new_pos] == b.ENTRANCE
+                  and self.dungeon is not None and self.model.level > 1):
+                self.previous_level()
 
     def new_level(self):
         """Create and launch a new level."""
-        self.model.reset_board()
-        self.model.level += 1
+        if self.dungeon is not None:
+            self.dungeon.travel(self.model, self.model.level + 1)
+            # the dungeon already filled the room
+            creatures = ()
+        elif self.levels is not None:
+            board, creatures = self.levels.take(self.model.level + 1)
+            self.model.reset_board(board)
+            self.model.level += 1
+        else:
+            creatures = None
+            self.model.reset_board()
+            self.model.level += 1
+        if self.telemetry:
+            self.telemetry.emit("level", self.model.turn, level=self.model.level)
         if self.model.level == 10:
             raise DeathError("""
     ---------------------------------
@@ -153,26 +325,115 @@ class Controller:
     ---------------------------------
 YOU DIED
             """)
+        elif creatures is not None:
+            for creature in creatures:
+                self.model.add_creature(creature)
         else:
             self.populate_room()
 
+    def previous_level(self):
+        """Go back up to the room before this one."""
+        self.dungeon.travel(self.model, self.model.level - 1)
+        if self.telemetry:
+            self.telemetry.emit("level", self.model.turn, level=self.model.level)
+
     def pickup(self, creature):
         """Player picks up items that he's standing on."""
         if creature == self.model.player:
             # pick up gear
-            if creature.pos in [x.pos for x in self.model.floor_items]:
-                gear = self.model.floor_items[[x.pos for x in self.model.floor_items].index(creature.pos)]
+            gear = self.model.board.item_at(creature.pos)
+            if gear is not None:
                 self.model.floor_items.remove(gear)
+                journal.keep(self.model.player.items)
                 self.model.player.items.append(gear)
+                if self.telemetry:
+                    self.telemetry.emit("pickup", self.model.turn, eid=gear.eid, item=gear.name)
 
     def round(self, wasd):
         """Player move, pickup, attack, and have other creatures move."""
+        prof = self.profiler
+        if prof: prof.begin(self.model.turn)
         self.move(self.model.player, wasd)
+        if prof: prof.lap("move")
         self.pickup(self.model.player)
-        for agg_creature in [x for x in self.model.creatures if x.aggressive]:
-            self.view.print(f"{agg_creature} moves towards you!")
-            self.move_toward(agg_creature, self.model.player)
+        if prof: prof.lap("pickup")
+        self.wake_watchers()
+        if self.model.store is not None:
+            self.chase_batch()
+        else:
+            for time, agg_creature in self.due():
+                if not self.view.quiet:
+                    self.view.print(f"{agg_creature} moves towards you!")
+                self.move_toward(agg_creature, self.model.player)
+                self.model.scheduler.done(agg_creature, time)
+                if prof: prof.count("touched")
+        if prof: prof.lap("chase")
         self.model.turn += 1
+        for creature, effect in self.model.effects.expire(self.model.turn):
+            if creature is self.model.player:
+                self.view.print(f"Your {effect} wears off.")
+
+    def wake_watchers(self):
+        """Schedule every aggressive creature in the player's field of view (roughly, every
+        one that can see the player)."""
+        board = self.model.board
+        visible = self.fov.visible(board, self.model.player.pos)
+        for eid in board.occupant[visible].tolist():
+            creature = board.entities.get(eid)
+            if creature is not None and creature.aggressive:
+                self.model.scheduler.wake(creature)
+
+    def due(self):
+        """(time, creature) for every creature due to chase this turn, in turn order.
+        Creatures that died, left the room, calmed down or lost sight of the player are
+        dropped from the schedule."""
+        board = self.model.board
+        visible = self.fov.visible(board, self.model.player.pos)
+        for time, creature in self.model.scheduler.due(self.model.turn, self.model.turn + 1):
+            if self.profiler: self.profiler.count("scanned")
+            if creature.board is board and creature.aggressive and visible[creature.pos]:
+                yield time, creature
+
+    def chase_batch(self):
+        """Every creature due this turn chases and attacks the player in one batch (store mode)."""
+        scheduler = self.model.scheduler
+        # Creatures faster than the player get more than one go in a turn, one batch per go.
+        batch = list(self.due())
+        while batch:
+            self.chase_step([creature._slot for time, creature in batch])
+            for time, creature in batch:
+                scheduler.done(creature, time)
+            batch = list(self.due())
+
+    def chase_step(self, slots):
+        """One batched chase by the given store slots."""
+        store = self.model.store
+        player = self.model.player
+        movers, attackers = store.chase(self.model.board, player, self.paths, slots)
+        if self.profiler: self.profiler.count("touched", len(movers) + len(attackers))
+        quiet = self.view.quiet
+        if len(movers) and not quiet:
+            self.view.print(f"{len(movers)} creatures move towards you!")
+        tel = self.telemetry
+        if tel:
+            for slot in movers.tolist():
+                tel.emit("move", self.model.turn, eid=int(store.eid[slot]),
+                         pos=(int(store.row[slot]), int(store.col[slot])))
+        if len(attackers):
+            p_hp = player.hp
+            if tel:
+                armor = player.armor
+                for slot in attackers.tolist():
+                    tel.emit("attack", self.model.turn, attacker=int(store.eid[slot]), defender=player.eid,
+                             dealt=float(store.damage[slot] / armor),
+                             taken=float(player.damage / store.armor[slot]))
+            store.exchange(attackers, player)
+            if not quiet:
+                for slot in attackers:
+                    self.view.print(f"{store.creatures[slot]} attacks the {player}!")
+                self.view.print(f"Damage: \n{player}:{round(p_hp - player.hp, 2)}\nHP: \n{player}:{round(player.hp, 2)}")
+            if player.hp <= 0:
+                raise DeathError("YOU DIED")
 
     def attack(self, attacker, defender):
         """damage should be calculated as a ratio between armor and damage, and applied to hp."""
@@ -182,39 +443,48 @@ YOU DIED
         attacker.hp -= (defender.damage / attacker.armor)
         defender.hp -= (attacker.damage / defender.armor)
 
+        tel = self.telemetry
+        if tel:
+            tel.emit("attack", self.model.turn, attacker=attacker.eid, defender=defender.eid,
+                     dealt=o_o_hp - defender.hp, taken=p_hp - attacker.hp)
+
         # Report damage
-        self.view.print(f"{attacker} attacks the {defender}!")
-        self.view.print(f"Damage: \n{attacker}:{round(p_hp - self.model.player.hp, 2)}\n{defender}: {round(o_o_hp - defender.hp, 2)}")
-        self.view.print(f"HP: \n{attacker}:{round(self.model.player.hp, 2)}\n{defender}: {round(defender.hp, 2)}")
+        quiet = self.view.quiet
+        if not quiet:
+            self.view.print(f"{attacker} attacks the {defender}!")
+            self.view.print(f"Damage: \n{attacker}:{round(p_hp - self.model.player.hp, 2)}\n{defender}: {round(o_o_hp - defender.hp, 2)}")
+            self.view.print(f"HP: \n{attacker}:{round(self.model.player.hp, 2)}\n{defender}: {round(defender.hp, 2)}")
 
         # Death
         if defender.hp < 0:
-            self.view.print(f"{defender} dies!")
+            if not quiet:
+                self.view.print(f"{defender} dies!")
             # Flip a coin to determine if gear is dropped
-            flip = np.random.randint(0,2)
+            flip = self.model.rng.combat.below(2)
+            if tel:
+                tel.emit("death", self.model.turn, eid=defender.eid, kind=type(defender).__name__,
+                         killer=attacker.eid)
             if flip:
-                dropped_gear = random.choice(g.gear_list)()
+                dropped_gear = self.model.rng.loot.choice(g.gear_list)()
                 dropped_gear.pos = copy.copy(defender.pos)
                 self.model.floor_items.append(dropped_gear)
+                if tel:
+                    tel.emit("drop", self.model.turn, eid=dropped_gear.eid, item=dropped_gear.name,
+                             pos=dropped_gear.pos)
             self.model.creatures.remove(defender)
+            journal.attr(attacker, "score")
             attacker.score += 1
         if (attacker == self.model.player and attacker.hp <= 0) or (defender == self.model.player and defender.hp <= 0):
             raise DeathError("YOU DIED")
 
     def move_toward(self, creature, other_creature):
-        """Move a creature one tile towards another creature."""
-        diff = (other_creature.pos[0] - creature.pos[0], other_creature.pos[1] - creature.pos[1])
-        if diff[0] < 0:
-            wasd = "w"
-        elif diff[0] > 0:
-            wasd = "s"
-        elif diff[1] < 0:
-            wasd = "a"
-        elif diff[1] > 0:
-            wasd = "d"
-        else:
+        """Move a creature one tile towards another creature, along the shared flow field.
+        Waits if every step that gets closer is blocked."""
+        if creature.pos == other_creature.pos:
             raise ValueError("Creatures should not occupy the same spot!")
-        self.move(creature, wasd)
+        wasd = self.paths.step(self.model.board, creature.pos, other_creature.pos)
+        if wasd is not None:
+            self.move(creature, wasd)
 
     def show_inventory(self):
         """Show the player's inventory"""
@@ -229,8 +499,11 @@ YOU DIED
     def equip_cmd(self):
         """Interface command to equip an item from inventory."""
         self.show_inventory()
+        self.equip_answer(self.ask("Which item would you like to equip?"))
+
+    def equip_answer(self, i):
+        """Equip the inventory slot the player picked."""
         try:
-            i = input("Which item would you like to equip?")
             i = int(i)
             try:
                 item = self.model.player.items[i]
@@ -248,8 +521,11 @@ YOU DIED
     def unequip_cmd(self):
         """Interface command to remove an item that is equipped."""
         self.show_equipment()
+        self.unequip_answer(self.ask("Which item would you like to remove?"))
+
+    def unequip_answer(self, i):
+        """Remove the equipment slot the player picked."""
         try:
-            i = input("Which item would you like to remove?")
             i = int(i)
             try:
                 self.unequip(self.model.player, self.model.player.equipment[i])
@@ -263,27 +539,81 @@ YOU DIED
         if gear.attaches == g.Attaches.noeq:
             raise ValueError("Cannot equip this item!")
         elif gear.attaches not in [x.attaches for x in creature.equipment]:
+            journal.keep(creature.equipment)
+            journal.keep(creature.items)
             creature.equipment.append(gear)
             creature.items.remove(gear)
-            creature.damage += gear.damage
-            creature.armor += gear.armor
+            creature.refresh()
+            if self.telemetry:
+                self.telemetry.emit("equip", self.model.turn, eid=creature.eid, item=gear.name)
         else:
             raise ValueError("Cannot equip gear in occupied slot!")
 
     def unequip(self, creature, gear):
         if gear in creature.equipment:
+            journal.keep(creature.equipment)
+            journal.keep(creature.items)
             creature.equipment.remove(gear)
             creature.items.append(gear)
-            creature.damage -= gear.damage
-            creature.armor -= gear.armor
+            creature.refresh()
+            if self.telemetry:
+                self.telemetry.emit("unequip", self.model.turn, eid=creature.eid, item=gear.name)
         else:
             raise ValueError("gear is not equipped!")
 
+    def save_cmd(self, path="savegame.srpg"):
+        """Interface command to save the game."""
+        savegame.save(self.model, path)
+        self.view.print(f"Game saved to {path}.")
+
+    def read_file(self, path):
+        """The bytes of a file the game depends on. They go into the replay log when the game
+        is being recorded, so a replay doesn't depend on what's on disk."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            if self.recorder is not None:
+                self.recorder.record_file(None)
+            raise
+        if self.recorder is not None:
+            self.recorder.record_file(data)
+        return data
+
+    def load_cmd(self, path="savegame.srpg"):
+        """Interface command to resume the saved game."""
+        try:
+            savegame.restore(self.model, *savegame.parse(self.read_file(path)))
+            if self.dungeon is not None:
+                # the rooms we kept belong to the game we just left
+                self.dungeon.forget()
+            self.view.print(f"Game loaded from {path}.")
+        except (OSError, SaveError) as e:
+            self.view.print(f"{e}\nCould not load a saved game.")
+
+    def stats_cmd(self):
+        """Interface command to show where turns spend their time."""
+        if self.profiler is None:
+            self.view.print("Profiling is off. Start the game with --profile.")
+        else:
+            self.view.print(self.profiler.stats())
+
+    def dump_cmd(self, path="turns.tsv"):
+        """Interface command to write the profiler's turn buffer to a file."""
+        if self.profiler is None:
+            self.view.print("Profiling is off. Start the game with --profile.")
+        else:
+            self.profiler.dump(path)
+            self.view.print(f"Turn timings written to {path}.")
+
     def quaff_cmd(self):
         """Interface command to equip an item from inventory."""
         self.show_inventory()
+        self.quaff_answer(self.ask("Which item would you like to quaff?"))
+
+    def quaff_answer(self, i):
+        """Quaff the inventory slot the player picked."""
         try:
-            i = input("Which item would you like to quaff?")
             i = int(i)
             try:
                 self.quaff(self.model.player, self.model.player.items[i])
@@ -294,21 +624,47 @@ YOU DIED
                     self.view.print(f"{type(e)} {e} ({i})\nYou must select a valid index.")
         except (ValueError):
             self.view.print(f"You must enter a valid integer, not {i}.")
+
     def quaff(self, creature, potion):
         if potion in creature.items:
+            journal.keep(creature.items)
             creature.items.remove(potion)
-            # TODO active potions
-            # creature.active.append((potion, self.view.turn + potion.turntimer))
             potion.take_effect(creature)
+            if self.telemetry:
+                self.telemetry.emit("quaff", self.model.turn, eid=creature.eid, item=potion.name)
+            effect = potion.effect()
+            if effect is not None:
+                self.model.effects.add(creature, effect, self.model.turn + potion.turntimer)
         else:
             raise ValueError("Potion is not in inventory!")
 
 
 class View:
-    def __init__(self, model):
+    """Shows the game on a terminal (or any file, out). Everything a turn prints is collected
+    and written in one go by flush(), which the Controller calls at the end of every turn
+    and before it asks anything."""
+    # Controller skips building messages nobody will see when this is True.
+    quiet = False
+
+    def __init__(self, model, renderer=None, out=None):
         self.model = model
-        # TODO replace print with https://stackoverflow.com/a/9996049
-        self.print = print
+        self.out = out or sys.stdout
+        self.buffer = []
+        # Optional render.TerminalRenderer. Without one, print_board reprints the whole room.
+        self.renderer = renderer
+
+    def print(self, *args):
+        self.buffer.append(" ".join(str(x) for x in args) + "\n")
+
+    def write(self, text):
+        """Add raw text to this turn's output (a renderer can use the View as its out)."""
+        self.buffer.append(text)
+
+    def flush(self):
+        if self.buffer:
+            self.out.write("".join(self.buffer))
+            self.buffer.clear()
+            self.out.flush()
 
     def new_game_screen(self):
         self.print(
@@ -322,14 +678,14 @@ class View:
 
     def print_board(self):
         """Display everything in the room."""
-        board_show = copy.copy(self.model.board)
-        board_show[4, 2] = 1
-        board_show[0, 2] = 9
-
-        for item in self.model.floor_items:
-            board_show[item.pos] = item
-        for creature in self.model.creatures:
-            board_show[creature.pos] = creature
+        if self.renderer is not None:
+            self.renderer.render()
+            return
+        board = self.model.board
+        board_show = board.terrain.astype(object)
+        for layer in (board.item, board.occupant):
+            for pos in zip(*np.nonzero(layer)):
+                board_show[pos] = board.entities[int(layer[pos])]
         board_show[self.model.player.pos] = self.model.player
 
         # Print the board with header
@@ -340,24 +696,65 @@ class View:
         self.print(f"level: {self.model.level}")
 
 
+class NullView(View):
+    """A View that shows nothing, for tests, simulations and benchmarks. It is quiet, so the
+    Controller doesn't even format the messages."""
+    quiet = True
+
+    def print(self, *args):
+        pass
+
+    def write(self, text):
+        pass
+
+    def print_board(self):
+        pass
+
+
 # Main
 if __name__ == "__main__":
-    model = Model()
-    view = View(model=model)
+    # Every game is seeded and recorded, so it can be replayed with replay.py.
+    import replaylog
+    seed = replaylog.new_seed()
+    model = Model(seed=seed)
+    # Redraw only what changed with ANSI escapes, if the terminal can take it.
+    renderer = None
+    if "--ansi" in sys.argv:
+        import render
+        renderer = render.TerminalRenderer(model)
+    view = View(model=model, renderer=renderer)
     controller = Controller(model=model, view=view)
+    if renderer is not None:
+        # frames go out in the same write as the rest of the turn
+        renderer.out = view
+        # fog of war, sharing the fields of view the creatures use
+        renderer.fov = controller.fov
+    controller.recorder = replaylog.Recorder("last_game.replay", seed)
+    # Build the next levels in the background while the player is busy with this one.
+    import dungeon
+    import levels
+    controller.levels = levels.LevelCache(seed)
+    controller.dungeon = dungeon.Dungeon(controller.levels)
+    if "--profile" in sys.argv:
+        import instrument
+        controller.profiler = instrument.TurnProfiler()
+    if "--telemetry" in sys.argv:
+        import telemetry
+        controller.telemetry = telemetry.Telemetry("telemetry")
 
     # Setup
     # Run game
-    controller.populate_room()
-    sword = g.Sword()
-    shield = g.Shield()
-    model.player.items.append(sword)
-    model.player.items.append(shield)
-    controller.equip(model.player, sword)
-    controller.equip(model.player, shield)
+    controller.start_game()
 
     view.new_game_screen()
     view.print_board()
-    controller.interface()
+    try:
+        controller.interface()
+    finally:
+        view.flush()
+        controller.recorder.finish(model)
+        controller.dungeon.close()
+        if controller.telemetry:
+            controller.telemetry.close()
 
     print("Done!")
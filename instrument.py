@@ -0,0 +1,78 @@
+"""Opt-in per-turn profiling: where does a turn's time go?
+
+Controller keeps a TurnProfiler in `profiler` (None when profiling is off, which costs one
+truth test per phase). Every turn gets a row in a fixed-size ring buffer with the wall time
+of each phase and a few counters, so a long session never grows it.
+"""
+import time
+
+import numpy as np
+
+phases = ("move", "pickup", "chase", "render")
+counters = ("scanned", "touched")
+
+row = np.dtype([("turn", "<i8")] + [(x, "<f8") for x in phases] + [(x, "<i8") for x in counters])
+
+
+class TurnProfiler:
+    def __init__(self, size=4096):
+        self.buffer = np.zeros(size, dtype=row)
+        # total turns recorded, the current row is (turns - 1) % size
+        self.turns = 0
+        self.calls = dict.fromkeys(phases, 0)
+        self.mark = time.perf_counter()
+
+    def begin(self, turn):
+        """Start a new turn's row (overwriting the oldest once the buffer is full)."""
+        i = self.turns % len(self.buffer)
+        self.buffer[i] = 0
+        self.current = self.buffer[i]
+        self.current["turn"] = turn
+        self.turns += 1
+        self.mark = time.perf_counter()
+
+    def tick(self):
+        """Restart the lap clock without charging the time to anything."""
+        self.mark = time.perf_counter()
+
+    def lap(self, phase):
+        """Charge the time since the last mark to phase, on the current turn."""
+        now = time.perf_counter()
+        if self.turns:
+            self.current[phase] += now - self.mark
+        self.calls[phase] += 1
+        self.mark = now
+
+    def count(self, counter, n=1):
+        if self.turns:
+            self.current[counter] += n
+
+    def rows(self):
+        """The recorded turns, oldest first."""
+        if self.turns <= len(self.buffer):
+            return self.buffer[:self.turns]
+        start = self.turns % len(self.buffer)
+        return np.concatenate([self.buffer[start:], self.buffer[:start]])
+
+    def stats(self):
+        """Percentiles of every phase (in ms) and counter over the buffered turns."""
+        rows = self.rows()
+        lines = [f"{len(rows)} turns (of {self.turns})"]
+        lines.append(f"{'':10}{'calls':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+        if not len(rows):
+            return "\n".join(lines)
+        for phase in phases:
+            p50, p90, p99, top = np.percentile(rows[phase] * 1000, [50, 90, 99, 100])
+            lines.append(f"{phase:10}{self.calls[phase]:8}{p50:10.3f}{p90:10.3f}{p99:10.3f}{top:10.3f}")
+        for counter in counters:
+            p50, p90, p99, top = np.percentile(rows[counter], [50, 90, 99, 100])
+            lines.append(f"{counter:10}{'':8}{p50:10.0f}{p90:10.0f}{p99:10.0f}{top:10.0f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Write the buffered turns to a tab separated file (times in seconds)."""
+        rows = self.rows()
+        with open(path, "w") as f:
+            f.write("\t".join(row.names) + "\n")
+            for r in rows.tolist():
+                f.write("\t".join(str(x) for x in r) + "\n")
@@ -0,0 +1,124 @@
+"""An undo log, so a search can try a move and take it back for about what the move changed.
+
+While a game is recording (Model.checkpoint starts it), every place that changes game
+state first notes how to put it back: an attribute's old value, an array cell's or dict
+entry's old value, or a copy of a list the first time it changes after a checkpoint.
+Rolling back replays those notes in reverse. When nothing is recording, each note is a
+single `log is None` test.
+
+Recording is per thread, one game per thread at a time: a game only records what its own
+thread changes, so a levels.LevelCache building rooms on its worker thread never writes
+into the log.
+"""
+import operator
+import threading
+
+import numpy as np
+
+
+class _Recording(threading.local):
+    def __init__(self):
+        # (function, *args) entries, newest last, while this thread is recording. Undoing
+        # one is function(*args).
+        self.log = None
+        # id(container) -> position in log of its kept copy, see keep()
+        self.kept = {}
+        # log positions of the live checkpoints, oldest first
+        self.marks = []
+
+
+_recording = _Recording()
+
+
+def recording():
+    """Is this thread recording?"""
+    return _recording.log is not None
+
+
+def start():
+    if _recording.log is None:
+        _recording.log = []
+
+
+def stop():
+    """Stop recording and forget how to undo anything."""
+    _recording.log = None
+    _recording.kept.clear()
+    _recording.marks.clear()
+
+
+def mark():
+    """The current log position, as a point to roll back to."""
+    position = len(_recording.log)
+    _recording.marks.append(position)
+    return position
+
+
+def undo(position):
+    """Undo everything noted since position."""
+    log = _recording.log
+    while len(log) > position:
+        entry = log.pop()
+        entry[0](*entry[1:])
+    _recording.kept = {k: v for k, v in _recording.kept.items() if v < position}
+    marks = _recording.marks
+    while marks and marks[-1] > position:
+        marks.pop()
+
+
+def note(fn, *args):
+    """Note that fn(*args) puts back a change that is about to happen."""
+    log = _recording.log
+    if log is not None:
+        log.append((fn, *args))
+
+
+def attr(obj, name):
+    """Note obj.name, which is about to change. Nothing to note while obj is still being
+    built (name isn't set yet), it didn't exist at the checkpoint."""
+    log = _recording.log
+    if log is not None and hasattr(obj, name):
+        log.append((setattr, obj, name, getattr(obj, name)))
+
+
+def item(container, key):
+    """Note container[key] (a dict entry, or array cells), which is about to change."""
+    log = _recording.log
+    if log is None:
+        return
+    if isinstance(container, dict):
+        if key in container:
+            log.append((operator.setitem, container, key, container[key]))
+        else:
+            log.append((_forget, container, key))
+        return
+    old = container[key]
+    if isinstance(old, np.ndarray):
+        old = old.copy()
+    log.append((operator.setitem, container, key, old))
+
+
+def keep(container):
+    """Note a whole list or set, which is about to change. Only the first change after
+    each checkpoint makes a copy."""
+    log = _recording.log
+    if log is None:
+        return
+    since = _recording.marks[-1] if _recording.marks else 0
+    if _recording.kept.get(id(container), -1) >= since:
+        return
+    _recording.kept[id(container)] = len(log)
+    log.append((_restore, container, container.copy()))
+
+
+def _forget(container, key):
+    container.pop(key, None)
+
+
+def _restore(container, contents):
+    if isinstance(container, list):
+        # list's own slice assignment, an EntityList mustn't re-track anything
+        list.__setitem__(container, slice(None), contents)
+    else:
+        container.clear()
+        container.update(contents)
@@ -0,0 +1,108 @@
+"""Levels described by a seed, built ahead of time so taking the exit doesn't stall.
+
+Every level is a pure function of its seed: generate(seed) always builds the same room with
+the same creatures in the same places. That makes LevelCache just a speed-up. It builds the
+next few levels on a worker thread, and anything it doesn't have ready (or has dropped) is
+built on the spot, identically.
+"""
+import hashlib
+import threading
+
+import board as b
+import creatures as c
+import placement
+import rng as rn
+
+
+def level_seed(game_seed, level):
+    """The seed of one level of a game."""
+    digest = hashlib.blake2b(f"{game_seed}:{level}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def generate(seed, shape=(5, 5), entrance=None, exit=None):
+    """(board, creatures) for a new room. The creatures have positions but aren't on the
+    board yet, Model.reset_board(board) then add_creature does that. The entrance and exit
+    default to the middle of the bottom and top rows."""
+    rng = rn.Rng(seed)
+    rows, cols = shape
+    board = b.Board(shape, entrance or (rows - 1, cols // 2), exit or (0, cols // 2))
+    positions = placement.sample(board, rng.spawning.randint(3, 7), rng.placement.generator)
+    creatures = []
+    for pos in positions:
+        creature = rng.spawning.choice(c.spawn_list)()
+        creature.pos = pos
+        creatures.append(creature)
+    return board, creatures
+
+
+class LevelCache:
+    """Keeps up to `ahead` upcoming levels of one game ready, built on a daemon thread.
+    With ahead=0 there is no thread and every level is built when it is taken. Rooms are
+    `shape` cells."""
+    def __init__(self, seed, ahead=2, shape=(5, 5)):
+        self.seed = seed
+        self.ahead = ahead
+        self.shape = shape
+        self.ready = {}
+        # the lowest level still worth having, everything below has been taken
+        self.next = 2
+        self.building = None
+        self.hits = 0
+        self.misses = 0
+        self.closed = False
+        self._cond = threading.Condition()
+        if ahead:
+            self.thread = threading.Thread(target=self._work, daemon=True)
+            self.thread.start()
+
+    def _missing(self):
+        for level in range(self.next, self.next + self.ahead):
+            if level not in self.ready:
+                return level
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self.closed and self._missing() is None:
+                    self._cond.wait()
+                if self.closed:
+                    return
+                level = self.building = self._missing()
+            built = generate(level_seed(self.seed, level), self.shape)
+            with self._cond:
+                self.building = None
+                if level >= self.next:
+                    self.ready[level] = built
+                self._cond.notify_all()
+
+    def take(self, level):
+        """(board, creatures) for a level, from the cache if it's ready. Levels below it are
+        dropped and the worker moves on to the ones after it."""
+        with self._cond:
+            # it's being built right now, waiting is quicker than starting over
+            while self.building == level:
+                self._cond.wait()
+            built = self.ready.pop(level, None)
+            self.next = level + 1
+            for stale in [x for x in self.ready if x < self.next]:
+                del self.ready[stale]
+            self._cond.notify_all()
+        if built is None:
+            self.misses += 1
+            return generate(level_seed(self.seed, level), self.shape)
+        self.hits += 1
+        return built
+
+    def clear(self):
+        """Drop every cached level (they'll be built again as needed)."""
+        with self._cond:
+            self.ready.clear()
+            self._cond.notify_all()
+
+    def close(self):
+        """Stop the worker thread."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
@@ -0,0 +1,59 @@
+"""Hammer a running server.py with simulated players.
+
+Run from the linux command line (with server.py running):
+python3 loadgen.py --players 300 --commands 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+PROMPT = b"'help':"
+
+
+async def player(host, port, commands, seed, latencies):
+    """One simulated player wandering around. Returns how many commands it got answered."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    done = 0
+    try:
+        await reader.readuntil(b"Name your character:")
+        writer.write(f"bot{seed}\n".encode())
+        await reader.readuntil(PROMPT)
+        for i in range(commands):
+            start = time.perf_counter()
+            writer.write((rng.choice("wasd") + "\n").encode())
+            await reader.readuntil(PROMPT)
+            latencies.append(time.perf_counter() - start)
+            done += 1
+    except asyncio.IncompleteReadError:
+        # this player's game ended
+        pass
+    finally:
+        writer.close()
+    return done
+
+
+async def run(host, port, players, commands):
+    latencies = []
+    start = time.perf_counter()
+    done = await asyncio.gather(*(player(host, port, commands, i, latencies) for i in range(players)))
+    elapsed = time.perf_counter() - start
+    return sum(done), elapsed, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test server.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--commands", type=int, default=100)
+    args = parser.parse_args()
+
+    total, elapsed, latencies = asyncio.run(run(args.host, args.port, args.players, args.commands))
+    latencies.sort()
+    print(f"{args.players} players, {total} commands in {elapsed:.2f} s ({total / elapsed:.0f} commands/s)")
+    if latencies:
+        p99 = latencies[int(0.99 * (len(latencies) - 1))]
+        print(f"latency p50 {statistics.median(latencies) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
@@ -0,0 +1,93 @@
+"""One shared distance field per goal, instead of every chaser working out its own way."""
+import numpy as np
+
+import board as b
+
+# Distance for cells the goal can't be reached from.
+UNREACHABLE = np.iinfo(np.int32).max
+
+# Neighbor offsets in wasd order. Ties go to the earlier entry, so rows come first like
+# the old greedy move_toward.
+neighbors = {
+    "w": (-1, 0),
+    "s": (1, 0),
+    "a": (0, -1),
+    "d": (0, 1),
+}
+
+
+def distance_field(passable, goal):
+    """Breadth first search from goal over a boolean passable mask, one whole frontier per
+    array operation. Returns the number of steps from every cell to goal."""
+    dist = np.full(passable.shape, UNREACHABLE, dtype=np.int32)
+    dist[goal] = 0
+    frontier = np.zeros(passable.shape, dtype=bool)
+    frontier[goal] = True
+    reached = frontier.copy()
+    grown = np.empty_like(frontier)
+    d = 0
+    while frontier.any():
+        d += 1
+        grown[:] = False
+        grown[1:] |= frontier[:-1]
+        grown[:-1] |= frontier[1:]
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+        np.logical_and(grown, passable, out=frontier)
+        frontier &= ~reached
+        reached |= frontier
+        dist[frontier] = d
+    return dist
+
+
+class FlowField:
+    """A cached distance field toward one goal cell.
+
+    The field only depends on the goal and the terrain, so it is recomputed when the goal
+    moves or the terrain changes and shared by every creature heading the same way."""
+    def __init__(self):
+        self.board = None
+        self.goal = None
+        self.terrain_version = None
+        self.dist = None
+        self.computed = 0
+
+    def update(self, board, goal):
+        """Make sure the field points at goal on board, recomputing only if it has to."""
+        if board is not self.board or goal != self.goal or board.terrain_version != self.terrain_version:
+            self.board = board
+            self.goal = goal
+            self.terrain_version = board.terrain_version
+            self.dist = distance_field(board.terrain != b.WALL, goal)
+            self.computed += 1
+        return self.dist
+
+    def step(self, board, pos, goal):
+        """The wasd key for the best free step from pos toward goal, or None to wait.
+
+        A step is free if nobody stands there, or if it's the goal itself (that's an attack)."""
+        dist = self.update(board, goal)
+        best = None
+        best_dist = dist[pos]
+        for wasd, (dr, dc) in neighbors.items():
+            cell = (pos[0] + dr, pos[1] + dc)
+            if not board.in_bounds(cell) or dist[cell] >= best_dist:
+                continue
+            if board.occupant[cell] and cell != goal:
+                continue
+            best, best_dist = wasd, dist[cell]
+        return best
+
+    def steps(self, board, rows, cols, goal):
+        """step() for many positions at once. Returns (drow, dcol) arrays, zeros to wait."""
+        dist = self.update(board, goal)
+        padded = np.full((dist.shape[0] + 2, dist.shape[1] + 2), UNREACHABLE, dtype=np.int32)
+        padded[1:-1, 1:-1] = np.where(board.occupant == 0, dist, UNREACHABLE)
+        padded[goal[0] + 1, goal[1] + 1] = 0
+        offsets = np.array(list(neighbors.values()))
+        candidates = padded[rows[:, None] + 1 + offsets[:, 0], cols[:, None] + 1 + offsets[:, 1]]
+        best = candidates.argmin(axis=1)
+        ok = candidates[np.arange(len(rows)), best] < dist[rows, cols]
+        drow = np.where(ok, offsets[best, 0], 0)
+        dcol = np.where(ok, offsets[best, 1], 0)
+        return drow, dcol
@@ -0,0 +1,40 @@
+"""Where new things go: sample distinct free cells in one draw instead of retrying collisions.
+
+A cell is free when it is plain floor (so never the entrance, the exit or a wall) and nobody
+stands on it. Exclusion zones keep a margin around the entrance and exit clear as well.
+"""
+import numpy as np
+
+import board as b
+from custom_exceptions import PlacementError
+
+
+def free_mask(board, clearance=0):
+    """Boolean array of free cells. clearance > 0 also excludes every cell within that many
+    steps (diagonals count as one) of the entrance and exit."""
+    free = (board.terrain == b.FLOOR) & (board.occupant == 0)
+    for row, col in (board.entrance, board.exit):
+        free[max(row - clearance, 0):row + clearance + 1, max(col - clearance, 0):col + clearance + 1] = False
+    return free
+
+
+def capacity(board, clearance=0):
+    """How many more creatures fit in the room."""
+    return int(np.count_nonzero(free_mask(board, clearance)))
+
+
+def for_density(board, density, clearance=0):
+    """How many creatures to add so that `density` of the free cells end up occupied."""
+    if not 0 <= density <= 1:
+        raise ValueError(f"density must be between 0 and 1, not {density}")
+    return int(density * capacity(board, clearance))
+
+
+def sample(board, n, rng=np.random, clearance=0):
+    """n distinct free positions, as a list of (row, col) in random order."""
+    cells = np.flatnonzero(free_mask(board, clearance))
+    if n > len(cells):
+        raise PlacementError(f"Can't place {n} creatures, there are only {len(cells)} free cells!")
+    picks = rng.choice(cells, size=n, replace=False)
+    rows, cols = np.unravel_index(picks, board.shape)
+    return list(zip(rows.tolist(), cols.tolist()))
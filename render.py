@@ -0,0 +1,107 @@
+"""Draw the board with ANSI escape codes, redrawing only the cells that changed."""
+import shutil
+import sys
+
+import numpy as np
+
+import board as b
+
+terrain_glyphs = {
+    b.FLOOR: ".",
+    b.ENTRANCE: "<",
+    b.WALL: "#",
+    b.EXIT: ">",
+}
+
+# The board starts on this screen line (1-based). Lines above it are the status header.
+TOP = 3
+
+
+def move_to(row, col):
+    """ANSI cursor position, 0-based board coordinates."""
+    return f"\x1b[{row + TOP};{2 * col + 1}H"
+
+
+class TerminalRenderer:
+    """Keeps the last frame as a character buffer and only re-emits the cells the board
+    marked dirty, plus the status header, in a single write per frame.
+
+    The board is pinned to the top of the screen and everything else the game prints
+    scrolls underneath it."""
+    def __init__(self, model, out=None, fov=None):
+        self.model = model
+        self.out = out or sys.stdout
+        self.frame = None
+        self.board = None
+        self.terrain_version = None
+        # Optional fov.FieldOfView for fog of war: out of sight cells show only the terrain
+        # remembered from when they were last seen, cells never seen are blank.
+        self.fov = fov
+        self.visible = None
+        self.seen = None
+
+    def glyph(self, pos):
+        board = self.model.board
+        if self.visible is not None and not self.visible[pos]:
+            return terrain_glyphs.get(int(board.terrain[pos]), "?") if self.seen[pos] else " "
+        entity = board.occupant_at(pos) or board.item_at(pos)
+        if entity is not None:
+            return repr(entity)
+        return terrain_glyphs.get(int(board.terrain[pos]), "?")
+
+    def header(self):
+        player = self.model.player
+        return (f"{player.name} HP:{round(player.hp, 2)} DMG:{player.damage} ARM:{player.armor} "
+                f"SCORE:{player.score} level: {self.model.level}")
+
+    def full_frame(self):
+        """Every cell from scratch. Used on the first frame and whenever the room changes."""
+        board = self.model.board
+        frame = np.empty(board.shape, dtype="<U1")
+        for pos, code in np.ndenumerate(board.terrain):
+            frame[pos] = terrain_glyphs.get(int(code), "?")
+        for layer in (board.item, board.occupant):
+            for pos in zip(*np.nonzero(layer)):
+                if self.visible is None or self.visible[pos]:
+                    frame[pos] = repr(board.entities[int(layer[pos])])
+        if self.seen is not None:
+            frame[~self.seen] = " "
+        return frame
+
+    def render(self):
+        board = self.model.board
+        parts = ["\x1b7"]
+        new_room = board is not self.board
+        # cells that came into or went out of sight need redrawing too
+        changed = ()
+        if self.fov is not None:
+            visible = self.fov.visible(board, self.model.player.pos)
+            if new_room:
+                self.seen = visible.copy()
+            else:
+                rows, cols = np.nonzero(visible != self.visible)
+                changed = zip(rows.tolist(), cols.tolist())
+                self.seen |= visible
+            self.visible = visible
+        if new_room or board.terrain_version != self.terrain_version:
+            self.board = board
+            self.terrain_version = board.terrain_version
+            self.frame = self.full_frame()
+            lines = shutil.get_terminal_size().lines
+            # clear, then keep scrolling output below the board
+            parts.append(f"\x1b[2J\x1b[{TOP + board.shape[0] + 1};{lines}r")
+            for row, cells in enumerate(self.frame):
+                parts.append(move_to(row, 0) + " ".join(cells))
+            parts.append(f"\x1b[{lines};1H\x1b7")
+        else:
+            for pos in board.dirty.union(changed):
+                if not board.in_bounds(pos):
+                    continue
+                glyph = self.glyph(pos)
+                if self.frame[pos] != glyph:
+                    self.frame[pos] = glyph
+                    parts.append(move_to(*pos) + glyph)
+        board.dirty.clear()
+        parts.append("\x1b[1;1H\x1b[2K" + self.header() + "\x1b8")
+        self.out.write("".join(parts))
+        self.out.flush()
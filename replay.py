@@ -0,0 +1,92 @@
+"""Record games as a seed plus every answer the player typed, and play them back.
+
+A replay log is a small text file:
+    simplerpg-replay 5
+    seed 1234
+    > Markemus
+    > w
+    > load
+    file U1JQRwUA...
+    ...
+    hash 5f0c...
+
+Lines starting with "> " are answers in the order the game asked for them (name,
+commands, and item indexes for equip/unequip/quaff). A "file" line holds the save file a
+load command read, base64 encoded ("file -" if there was none), so loading is replayed
+from the log rather than from whatever is on disk by then. The hash is of the saved game state
+when the recording ended. Playing a log back runs the real Controller with a NullView,
+and checks it ends up in the same state. Levels after the first are built from the seed too
+(see levels.py), so the log doesn't need to describe them.
+
+Run from the linux command line:
+python3 replay.py last_game.replay
+"""
+import sys
+import time
+
+import dungeon
+import index
+import levels
+from replaylog import HEADER, Recorder, new_seed, read, state_hash
+
+
+class ReplayController(index.Controller):
+    """A Controller whose player is a replay log. Files come from the log too, and game over
+    doesn't touch the high scores."""
+    def __init__(self, model, view, answers, files=()):
+        super().__init__(model, view)
+        self.answers = iter(answers)
+        self.files = iter(files)
+
+    def read_file(self, path):
+        data = next(self.files, None)
+        if data is None:
+            raise FileNotFoundError(f"No {path} was read when the game was recorded.")
+        return data
+
+    def ask(self, prompt):
+        try:
+            return next(self.answers)
+        except StopIteration:
+            raise EOFError("The replay log ran out of answers.")
+
+    def save_score(self):
+        pass
+
+
+def play(seed, answers, files=()):
+    """Play a recorded game without rendering and return its final Model."""
+    model = index.Model(seed=seed)
+    view = index.NullView(model=model)
+    controller = ReplayController(model, view, answers, files)
+    # levels come from the seed alone, no need to build them ahead
+    controller.levels = levels.LevelCache(seed, ahead=0)
+    controller.dungeon = dungeon.Dungeon(controller.levels)
+    controller.start_game()
+    try:
+        controller.interface()
+    except EOFError:
+        # the recording was cut short (the game crashed or was killed), stop where it stopped
+        pass
+    finally:
+        controller.dungeon.close()
+    return model
+
+
+def check(path):
+    """Replay a log. Returns (matches, model, seconds)."""
+    seed, answers, files, expected = read(path)
+    start = time.perf_counter()
+    model = play(seed, answers, files)
+    elapsed = time.perf_counter() - start
+    return state_hash(model) == expected, model, elapsed
+
+
+if __name__ == "__main__":
+    failed = False
+    for path in sys.argv[1:]:
+        ok, model, elapsed = check(path)
+        rate = model.turn / elapsed if elapsed else float("inf")
+        print(f"{path}: {'ok' if ok else 'MISMATCH'} ({model.turn} turns, {elapsed * 1000:.1f} ms, {rate:.0f} turns/s)")
+        failed = failed or not ok
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,66 @@
+"""Replay logs: writing them as a game is played (Recorder) and reading them back.
+
+The format is described in replay.py, which plays logs back. This module doesn't import
+index, so the game can record itself without loading a second copy of index.
+"""
+import base64
+import hashlib
+import random
+
+import savegame
+
+HEADER = "simplerpg-replay 5"
+
+
+def new_seed():
+    return random.SystemRandom().randrange(2**32)
+
+
+def state_hash(model):
+    """A short fingerprint of everything a saved game would contain."""
+    return hashlib.blake2b(savegame.dumps(model), digest_size=16).hexdigest()
+
+
+class Recorder:
+    """Keeps a replay log for one game. Lines are buffered and written by finish()."""
+    def __init__(self, path, seed):
+        self.path = path
+        self.seed = seed
+        self.lines = []
+
+    def record(self, answer):
+        self.lines.append(f"> {answer}")
+
+    def record_file(self, data):
+        """Keep the contents of a file the game read (None if it couldn't be read)."""
+        self.lines.append("file " + ("-" if data is None else base64.b64encode(data).decode()))
+
+    def finish(self, model):
+        with open(self.path, "w") as f:
+            f.write(f"{HEADER}\nseed {self.seed}\n")
+            for line in self.lines:
+                f.write(f"{line}\n")
+            f.write(f"hash {state_hash(model)}\n")
+
+
+def read(path):
+    """(seed, answers, files, expected hash or None) from a replay log. Files are the bytes
+    of every file the game read, in order, or None for one that couldn't be read."""
+    seed = None
+    answers = []
+    files = []
+    expected = None
+    with open(path) as f:
+        if f.readline().rstrip("\n") != HEADER:
+            raise ValueError(f"{path} is not a replay log!")
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("> "):
+                answers.append(line[2:])
+            elif line.startswith("file "):
+                files.append(None if line == "file -" else base64.b64decode(line[5:]))
+            elif line.startswith("seed "):
+                seed = int(line[5:])
+            elif line.startswith("hash "):
+                expected = line[5:]
+    return seed, answers, files, expected
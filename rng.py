@@ -0,0 +1,105 @@
+"""The game's randomness: named, independent streams derived from one seed.
+
+    rng = Rng(seed)
+    creature = rng.spawning.choice(c.spawn_list)()
+    flip = rng.combat.below(2)
+
+Each stream (spawning, placement, loot, combat) has its own numpy Generator, so whatever one
+part of the game draws never shifts what another gets, and the seed fixes all of them. Single
+draws are handed out of a block of uniform floats drawn in bulk, which costs much less per
+call than random.choice or np.random.randint. Bulk work (placement.sample) uses a stream's
+generator directly.
+
+Tests swap in a Fixed stream rather than patching numpy: model.rng.combat = rng.Fixed([1])
+"""
+import copy
+
+import numpy as np
+
+names = ("spawning", "placement", "loot", "combat")
+
+
+class Stream:
+    """Random numbers for one part of the game."""
+    def __init__(self, generator, block=1024):
+        self.generator = generator
+        self.block = block
+        # the current block (replaced, never changed in place) and the next one to hand out
+        self._values = []
+        self._next = 0
+
+    def random(self):
+        """A float in [0, 1)."""
+        i = self._next
+        if i == len(self._values):
+            self._values = self.generator.random(self.block).tolist()
+            i = 0
+        self._next = i + 1
+        return self._values[i]
+
+    def below(self, n):
+        """An int in [0, n)."""
+        return int(self.random() * n)
+
+    def randint(self, low, high):
+        """An int in [low, high], both included, like random.randint."""
+        return low + self.below(high - low + 1)
+
+    def choice(self, seq):
+        return seq[self.below(len(seq))]
+
+    def getstate(self):
+        return self.generator.bit_generator.state, self._values, self._next
+
+    def setstate(self, state):
+        self.generator.bit_generator.state, self._values, self._next = state
+
+    def copy(self):
+        # a new bit generator set to this one's state, several times cheaper than deepcopy
+        bits = self.generator.bit_generator
+        twin = type(bits)(bits.seed_seq)
+        twin.state = bits.state
+        other = copy.copy(self)
+        other.generator = np.random.Generator(twin)
+        return other
+
+
+class Fixed(Stream):
+    """A stream that hands out the given values, over and over, for tests. below, randint
+    and choice's index are the values themselves."""
+    def __init__(self, values):
+        super().__init__(np.random.default_rng(0))
+        self.values = list(values)
+
+    def random(self):
+        value = self.values[self._next % len(self.values)]
+        self._next += 1
+        return value
+
+    def below(self, n):
+        return self.random()
+
+    def randint(self, low, high):
+        return self.random()
+
+
+class Rng:
+    """Every stream of one game (or one level, see levels.generate)."""
+    def __init__(self, seed=None):
+        self.seed = seed
+        for name, child in zip(names, np.random.SeedSequence(seed).spawn(len(names))):
+            setattr(self, name, Stream(np.random.default_rng(child)))
+
+    def getstate(self):
+        return {name: getattr(self, name).getstate() for name in names}
+
+    def setstate(self, state):
+        for name, stream_state in state.items():
+            getattr(self, name).setstate(stream_state)
+
+    def copy(self):
+        other = Rng.__new__(Rng)
+        other.seed = self.seed
+        for name in names:
+            setattr(other, name, getattr(self, name).copy())
+        return other
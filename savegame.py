@@ -0,0 +1,330 @@
+"""Save and resume a whole game session in a compact binary file.
+
+Layout (little endian):
+    header      magic, format version, turn, level, board shape, record counts, player name
+    terrain     one int8 per cell
+    creatures   fixed-width creature records (base stats, without gear), the player first
+    gear        fixed-width gear records (floor, inventory and equipped), gear by type id
+    effects     fixed-width records of running effects, in the order they expire
+
+Entity sections are plain NumPy record arrays, so reading them is a memory map or a
+single buffer view rather than a parse.
+"""
+import struct
+
+import numpy as np
+
+import board as b
+import creatures as c
+import effects as fx
+import gear as g
+from custom_exceptions import *
+
+MAGIC = b"SRPG"
+VERSION = 3
+
+header = struct.Struct("<4sHiiiiiii32s")
+
+creature_record = np.dtype([
+    ("type", "u1"),
+    ("aggressive", "u1"),
+    ("row", "<i2"),
+    ("col", "<i2"),
+    ("hp", "<f8"),
+    ("damage", "<f8"),
+    ("armor", "<f8"),
+    ("score", "<i4"),
+])
+
+# where a piece of gear is
+FLOOR = 0
+INVENTORY = 1
+EQUIPPED = 2
+
+gear_record = np.dtype([
+    ("type", "u1"),
+    ("where", "u1"),
+    ("row", "<i2"),
+    ("col", "<i2"),
+    ("turntimer", "<i4"),
+])
+
+effect_record = np.dtype([
+    ("owner", "<i4"),  # index of the creature's record
+    ("expires", "<i4"),
+    ("damage", "<f8"),
+    ("armor", "<f8"),
+    ("name", "S16"),
+])
+
+
+def encode_name(name, size=32):
+    """name as at most size bytes of UTF-8, cut on a character boundary."""
+    return name.encode()[:size].decode(errors="ignore").encode()
+
+
+def _sections(data, offset, rows, cols, n_creatures, n_gear, n_effects=0):
+    """(terrain, creature records, gear records, effect records) viewed from data after a
+    header, checking first that data is long enough to hold what the header promises."""
+    if min(rows, cols, n_creatures, n_gear, n_effects) < 0:
+        raise SaveError("Saved game is corrupt!")
+    size = (offset + rows * cols + n_creatures * creature_record.itemsize + n_gear * gear_record.itemsize
+            + n_effects * effect_record.itemsize)
+    if len(data) < size:
+        raise SaveError(f"Saved game is truncated ({len(data)} of {size} bytes)!")
+    terrain = np.frombuffer(data, dtype=np.int8, count=rows * cols, offset=offset).reshape(rows, cols)
+    offset += terrain.nbytes
+    crecs = np.frombuffer(data, dtype=creature_record, count=n_creatures, offset=offset)
+    offset += crecs.nbytes
+    grecs = np.frombuffer(data, dtype=gear_record, count=n_gear, offset=offset)
+    offset += grecs.nbytes
+    erecs = np.frombuffer(data, dtype=effect_record, count=n_effects, offset=offset)
+    _check(terrain, crecs, grecs, erecs)
+    return terrain, crecs, grecs, erecs
+
+
+def _check(terrain, crecs, grecs, erecs):
+    """Raise SaveError for records that make_board, make_creatures, make_gear or restore
+    couldn't use, before any of them has built (or changed) anything."""
+    if (terrain == b.ENTRANCE).sum() != 1 or (terrain == b.EXIT).sum() != 1:
+        raise SaveError("Saved game is corrupt (it needs one entrance and one exit)!")
+    if len(crecs) and crecs["type"].max() >= len(c.creature_types):
+        raise SaveError("Saved game is corrupt (unknown creature)!")
+    if len(grecs) and (grecs["type"].max() >= len(g.gear_types) or grecs["where"].max() > EQUIPPED):
+        raise SaveError("Saved game is corrupt (unknown gear)!")
+    if len(erecs) and not 0 <= erecs["owner"].min() <= erecs["owner"].max() < len(crecs):
+        raise SaveError("Saved game is corrupt (effect of a missing creature)!")
+
+
+def creature_records(creatures):
+    """Records for creatures, in order."""
+    crecs = np.zeros(len(creatures), dtype=creature_record)
+    crecs["type"] = [x.type_id for x in creatures]
+    crecs["aggressive"] = [x.aggressive for x in creatures]
+    crecs["row"] = [x.pos[0] for x in creatures]
+    crecs["col"] = [x.pos[1] for x in creatures]
+    crecs["hp"] = [x.hp for x in creatures]
+    crecs["damage"] = [x.base_damage for x in creatures]
+    crecs["armor"] = [x.base_armor for x in creatures]
+    crecs["score"] = [x.score for x in creatures]
+    return crecs
+
+
+def gear_records(gear):
+    """Records for (gear, where) pairs."""
+    grecs = np.zeros(len(gear), dtype=gear_record)
+    grecs["type"] = [x.type_id for x, where in gear]
+    grecs["where"] = [where for x, where in gear]
+    grecs["row"] = [x.pos[0] if where == FLOOR else 0 for x, where in gear]
+    grecs["col"] = [x.pos[1] if where == FLOOR else 0 for x, where in gear]
+    grecs["turntimer"] = [getattr(x, "turntimer", 0) for x, where in gear]
+    return grecs
+
+
+def effect_records(timers, creatures):
+    """Records for the running effects of creatures, in the order they expire. Effects of
+    creatures not in the list (say, in a room the player left) aren't kept."""
+    owners = {id(x): i for i, x in enumerate(creatures)}
+    running = [x for x in sorted(timers.heap, key=lambda x: x[:2]) if id(x[2]) in owners]
+    erecs = np.zeros(len(running), dtype=effect_record)
+    erecs["owner"] = [owners[id(creature)] for expires, seq, creature, effect in running]
+    erecs["expires"] = [expires for expires, seq, creature, effect in running]
+    erecs["damage"] = [effect.damage for expires, seq, creature, effect in running]
+    erecs["armor"] = [effect.armor for expires, seq, creature, effect in running]
+    erecs["name"] = [encode_name(effect.name, 16) for expires, seq, creature, effect in running]
+    return erecs
+
+
+def dumps(model):
+    """The model as bytes."""
+    creatures = [model.player] + [x for x in model.creatures if x is not model.player]
+    crecs = creature_records(creatures)
+    grecs = gear_records([(x, FLOOR) for x in model.floor_items]
+                         + [(x, INVENTORY) for x in model.player.items]
+                         + [(x, EQUIPPED) for x in model.player.equipment])
+    erecs = effect_records(model.effects, creatures)
+    rows, cols = model.board.shape
+    head = header.pack(MAGIC, VERSION, model.turn, model.level, rows, cols, len(crecs), len(grecs),
+                       len(erecs), encode_name(model.player.name))
+    return b"".join([head, model.board.terrain.tobytes(), crecs.tobytes(), grecs.tobytes(), erecs.tobytes()])
+
+
+def save(model, path):
+    with open(path, "wb") as f:
+        f.write(dumps(model))
+
+
+def parse(data):
+    """Split saved bytes (or a memory map of them) into (header fields, terrain, creatures, gear,
+    effects) without copying the record arrays."""
+    if len(data) < 6:
+        raise SaveError("Not a saved game!")
+    magic, version = struct.unpack_from("<4sH", data)
+    if magic != MAGIC:
+        raise SaveError("Not a saved game!")
+    if version != VERSION:
+        raise SaveError(f"Saved game is version {version}, expected {VERSION}.")
+    if len(data) < header.size:
+        raise SaveError("Saved game is truncated!")
+    magic, version, turn, level, rows, cols, n_creatures, n_gear, n_effects, name = header.unpack_from(data)
+    if n_creatures < 1:
+        raise SaveError("Saved game is corrupt (no player)!")
+    sections = _sections(data, header.size, rows, cols, n_creatures, n_gear, n_effects)
+    fields = {"turn": turn, "level": level, "name": name.rstrip(b"\0").decode(errors="replace")}
+    return (fields,) + sections
+
+
+def read(path, mmap=True):
+    """parse() a save file, memory mapping it unless mmap is False."""
+    if mmap:
+        try:
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+        except ValueError:
+            # numpy won't map an empty file
+            raise SaveError("Not a saved game!")
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+    return parse(data)
+
+
+def make_board(terrain):
+    """A fresh board with the saved terrain."""
+    entrance = tuple(int(x[0]) for x in np.nonzero(terrain == b.ENTRANCE))
+    exit = tuple(int(x[0]) for x in np.nonzero(terrain == b.EXIT))
+    board = b.Board(terrain.shape, entrance, exit)
+    board.terrain[:] = terrain
+    return board
+
+
+# (entity type, fields the caller sets) -> (other slots' values in a new one, slots holding lists)
+_defaults = {}
+
+
+def _blank(entity_type, given=frozenset()):
+    """A new entity the way its __init__ leaves it, without running __init__ (and every stat
+    setter in it) again. Slots named in `given` are left for the caller to set, lists are
+    fresh rather than shared."""
+    defaults = _defaults.get((entity_type, given))
+    if defaults is None:
+        model = entity_type()
+        names = [x for t in entity_type.__mro__ for x in getattr(t, "__slots__", ())
+                 if hasattr(model, x) and x not in given and x != "eid"]
+        lists = [x for x in names if isinstance(getattr(model, x), list)]
+        defaults = _defaults[entity_type, given] = (
+            [(x, getattr(model, x)) for x in names if x not in lists], lists)
+    values, lists = defaults
+    entity = entity_type.__new__(entity_type)
+    for name, value in values:
+        setattr(entity, name, value)
+    for name in lists:
+        setattr(entity, name, [])
+    entity.eid = next(b._ids)
+    return entity
+
+
+# what make_creatures and make_gear set themselves
+_creature_fields = frozenset({"_aggressive", "_hp", "_damage", "_armor", "base_damage", "base_armor",
+                              "score", "_pos"})
+_gear_fields = frozenset({"_pos"})
+
+
+def make_creatures(crecs, first=None):
+    """Creatures (not on any board yet) from records. The first record goes into `first`
+    instead of a new creature, if given."""
+    # Pull whole columns out as lists first, indexing record scalars one by one is slow.
+    columns = [crecs[x].tolist() for x in ("type", "aggressive", "hp", "damage", "armor", "score", "row", "col")]
+    creatures = []
+    for i, (type_id, aggressive, hp, damage, armor, score, row, col) in enumerate(zip(*columns)):
+        if i == 0 and first is not None:
+            creature = first
+            creature.aggressive = bool(aggressive)
+            creature.hp = hp
+            creature.base_damage = damage
+            creature.base_armor = armor
+            creature.refresh()
+            creature.score = score
+            creature.pos = (row, col)
+        else:
+            # a new creature has no equipment or effects, its stats are just the base ones
+            creature = _blank(c.creature_types[type_id], _creature_fields)
+            creature._aggressive = bool(aggressive)
+            creature._hp = hp
+            creature.base_damage = creature._damage = damage
+            creature.base_armor = creature._armor = armor
+            creature.score = score
+            creature._pos = (row, col)
+        creatures.append(creature)
+    return creatures
+
+
+def make_gear(grecs):
+    """(gear, where) pairs from records. Floor gear gets its position."""
+    gear = []
+    columns = [grecs[x].tolist() for x in ("type", "where", "turntimer", "row", "col")]
+    for type_id, where, turntimer, row, col in zip(*columns):
+        item = _blank(g.gear_types[type_id], _gear_fields)
+        if isinstance(item, g.Potion):
+            item.turntimer = turntimer
+        item._pos = (row, col) if where == FLOOR else None
+        gear.append((item, where))
+    return gear
+
+
+def restore(model, fields, terrain, crecs, grecs, erecs):
+    """Rebuild model in place from parsed save data. The new board and entities are built
+    before the model is touched, so a save that fails to load leaves the game as it was."""
+    board = make_board(terrain)
+    creatures = make_creatures(crecs[1:])
+    gear = make_gear(grecs)
+    columns = [erecs[x].tolist() for x in ("owner", "expires", "damage", "armor", "name")]
+    effects = [(owner, expires, fx.Effect(name.decode(errors="replace"), damage=damage, armor=armor))
+               for owner, expires, damage, armor, name in zip(*columns)]
+
+    model.turn = fields["turn"]
+    model.level = fields["level"]
+    model.reset_board(board)
+    player = model.player
+    player.name = fields["name"]
+    player.items = [item for item, where in gear if where == INVENTORY]
+    player.equipment = [item for item, where in gear if where == EQUIPPED]
+    player.effects = ()
+    model.effects = fx.Timers()
+    make_creatures(crecs[:1], first=player)
+    model.creatures.extend(creatures)
+    model.floor_items.extend(item for item, where in gear if where == FLOOR)
+    player.refresh()
+    owners = [player] + creatures
+    for owner, expires, effect in effects:
+        model.effects.add(owners[owner], effect, expires)
+    return model
+
+
+def load(path, model, mmap=True):
+    """Load a save file into model, replacing whatever game it had."""
+    return restore(model, *read(path, mmap))
+
+
+room_header = struct.Struct("<4sHiiii")
+ROOM_MAGIC = b"SRRM"
+
+
+def dumps_room(board, creatures, floor_items):
+    """One room (not the player) as bytes, in the same records as a saved game."""
+    crecs = creature_records(creatures)
+    grecs = gear_records([(x, FLOOR) for x in floor_items])
+    rows, cols = board.shape
+    head = room_header.pack(ROOM_MAGIC, VERSION, rows, cols, len(crecs), len(grecs))
+    return b"".join([head, board.terrain.tobytes(), crecs.tobytes(), grecs.tobytes()])
+
+
+def loads_room(data):
+    """(board, creatures, floor items) from dumps_room bytes. The entities have positions
+    but aren't on the board yet."""
+    if len(data) < room_header.size:
+        raise SaveError("Not a saved room!")
+    magic, version, rows, cols, n_creatures, n_gear = room_header.unpack_from(data)
+    if magic != ROOM_MAGIC or version != VERSION:
+        raise SaveError("Not a saved room of this version!")
+    terrain, crecs, grecs, erecs = _sections(data, room_header.size, rows, cols, n_creatures, n_gear)
+    return make_board(terrain), make_creatures(crecs), [item for item, where in make_gear(grecs)]
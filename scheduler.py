@@ -0,0 +1,70 @@
+"""Who acts when: creatures wait in a heap keyed by the time of their next action.
+
+Time is measured in turns. A creature gains `speed` energy per turn and an action costs
+ACTION_COST, so after acting at time t it is next due at t + ACTION_COST / speed. Only
+awake creatures are in the heap; dormant ones (non-aggressive creatures, for now) cost
+nothing until something wakes them.
+"""
+import heapq
+import itertools
+
+import journal
+
+ACTION_COST = 1.0
+
+
+class Scheduler:
+    def __init__(self, now=0):
+        self.heap = []
+        self.now = now
+        # ties go to whoever was scheduled first, so turn order is deterministic
+        self._seq = itertools.count()
+        self._scheduled = set()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def copy(self, copies):
+        """A copy for copied creatures (copies maps id(creature) to its copy). Creatures
+        that weren't copied (the dead, say) are left out."""
+        other = Scheduler(now=self.now)
+        other.heap = [(time, seq, copies[id(x)]) for time, seq, x in self.heap if id(x) in copies]
+        heapq.heapify(other.heap)
+        other._scheduled = {x.eid for time, seq, x in other.heap}
+        other._seq = itertools.count(next(self._seq))
+        return other
+
+    def _note(self):
+        journal.keep(self.heap)
+        journal.keep(self._scheduled)
+        journal.attr(self, "now")
+
+    def add(self, creature):
+        """Schedule a creature that just arrived, if it has any reason to act."""
+        if creature.aggressive:
+            self.wake(creature)
+
+    def wake(self, creature, time=None):
+        """Put a creature in the queue (it acts at `time`, default now). No-op if already there."""
+        if creature.eid in self._scheduled:
+            return
+        self._note()
+        self._scheduled.add(creature.eid)
+        heapq.heappush(self.heap, (self.now if time is None else time, next(self._seq), creature))
+
+    def done(self, creature, time):
+        """A creature acted at time; queue its next action."""
+        self.wake(creature, time + ACTION_COST / creature.speed)
+
+    def due(self, start, end):
+        """Pop (time, creature) for every action due in [start, end), in order. Anything
+        overdue (the clock jumped, say after loading a game) acts at start rather than
+        catching up. Creatures go back in the queue only through done(), so anything not
+        handed back falls asleep."""
+        self._note()
+        while self.heap and self.heap[0][0] < end:
+            time, seq, creature = heapq.heappop(self.heap)
+            self._scheduled.discard(creature.eid)
+            self.now = max(time, start)
+            yield self.now, creature
+        self.now = max(self.now, end)
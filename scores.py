@@ -0,0 +1,134 @@
+"""High scores: an append-only log of every game plus a small top-k index.
+
+<path>.log holds one fixed-width binary record per finished game, in the order games
+finished. <path>.tsv is the top-k table players see (same format high_scores.tsv always
+had). Writers take an exclusive lock on <path>.lock, so any number of processes can
+finish games at the same time.
+"""
+import contextlib
+import datetime
+import fcntl
+import heapq
+import os
+import re
+
+import numpy as np
+
+record = np.dtype([("score", "<i4"), ("date", "<i4"), ("name", "S32")])
+
+# Names are escaped in the tsv, so a tab or newline in one can't break the table.
+_escapes = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+_unescapes = {v: k for k, v in _escapes.items()}
+
+
+def encode_name(name):
+    """name as it fits a record: at most 32 bytes of UTF-8, cut on a character boundary."""
+    return name.encode()[:32].decode(errors="ignore").encode()
+
+
+def escape(name):
+    return re.sub(r"[\\\t\n\r]", lambda m: _escapes[m.group()], name)
+
+
+def unescape(text):
+    return re.sub(r"\\[\\tnr]", lambda m: _unescapes[m.group()], text)
+
+
+class ScoreStore:
+    def __init__(self, path="high_scores", k=3):
+        self.log_path = f"{path}.log"
+        self.top_path = f"{path}.tsv"
+        self.lock_path = f"{path}.lock"
+        self.k = k
+
+    @contextlib.contextmanager
+    def locked(self):
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def add(self, score, name, date=None):
+        """Record a finished game. Dates must arrive in order (they're today), query() relies
+        on it, so a date older than the last game's is a ValueError."""
+        date = date or datetime.date.today()
+        encoded = encode_name(name)
+        # the table shows the name as the log keeps it
+        name = encoded.decode()
+        row = np.array([(score, date.toordinal(), encoded)], dtype=record)
+        with self.locked():
+            with open(self.log_path, "a+b") as log:
+                last = self._last_date(log)
+                if last is not None and date.toordinal() < last:
+                    raise ValueError(f"{date} is before the last recorded game "
+                                     f"({datetime.date.fromordinal(last)})")
+                log.write(row.tobytes())
+            # The top table is a min-heap of the best k, so a new score is one push or pushpop.
+            # Equal scores rank by age, so the newest of them is the first to go.
+            top = [(x[0], -i, x) for i, x in enumerate(self.top())]
+            heapq.heapify(top)
+            entry = (score, -len(top), (score, name, date))
+            if len(top) < self.k:
+                heapq.heappush(top, entry)
+            elif score > top[0][0]:
+                heapq.heappushpop(top, entry)
+            self._write_top([x[2] for x in sorted(top, key=lambda x: (-x[0], -x[1]))])
+
+    @staticmethod
+    def _last_date(log):
+        """The date ordinal of the last record in a log open for a+b, None if it's empty."""
+        size = log.seek(0, os.SEEK_END)
+        if size < record.itemsize:
+            return None
+        log.seek(size - size % record.itemsize - record.itemsize)
+        return int(np.frombuffer(log.read(record.itemsize), dtype=record)["date"][0])
+
+    def _write_top(self, rows):
+        tmp = self.top_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("score\tname\tdate\n")
+            for score, name, date in rows:
+                f.write(f"{score}\t{escape(name)}\t{date.isoformat()}\n")
+        os.replace(tmp, self.top_path)
+
+    def top(self):
+        """The top-k table as (score, name, date) rows, best first."""
+        if not os.path.exists(self.top_path):
+            return []
+        rows = []
+        with open(self.top_path) as f:
+            next(f)
+            for line in f:
+                score, name, date = line.rstrip("\n").split("\t")
+                rows.append((int(score), unescape(name), datetime.date.fromisoformat(date)))
+        return rows
+
+    def history(self):
+        """Every recorded game as a read-only memory map of the log (nothing is read yet)."""
+        if not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0:
+            return np.zeros(0, dtype=record)
+        return np.memmap(self.log_path, dtype=record, mode="r")
+
+    def query(self, name=None, start=None, end=None):
+        """Games by name and/or within [start, end], as (score, name, date) rows in log order.
+
+        The date range is found by binary search on the log, so only the matching part of
+        it is ever paged in. A name is matched by scanning the name column of that range, so
+        a name alone still reads 32 bytes for every game in the log."""
+        games = self.history()
+        dates = games["date"]
+        lo = np.searchsorted(dates, start.toordinal(), "left") if start else 0
+        hi = np.searchsorted(dates, end.toordinal(), "right") if end else len(games)
+        games = games[lo:hi]
+        if name is not None:
+            games = games[games["name"] == encode_name(name)]
+        return [(int(x["score"]), x["name"].decode(errors="replace"), datetime.date.fromordinal(int(x["date"])))
+                for x in games]
+
+    def format_top(self):
+        lines = ["score\tname\tdate"]
+        for score, name, date in self.top():
+            lines.append(f"{score}\t{escape(name)}\t{date}")
+        return "\n".join(lines)
@@ -0,0 +1,108 @@
+"""Host many games in one process over plain TCP (telnet works fine as a client).
+
+Run from the linux command line:
+python3 server.py --port 4000
+then connect with: telnet localhost 4000
+"""
+import argparse
+import asyncio
+
+import index
+
+# Commands that touch files on the server, which one player shouldn't be able to do to another.
+local_only = ("save", "load", "stats", "dump")
+
+
+class BufferView(index.View):
+    """A View that keeps everything a turn prints until it is taken, to be sent in one write."""
+    def flush(self):
+        pass
+
+    def take(self):
+        text = "".join(self.buffer)
+        self.buffer.clear()
+        return text
+
+
+class Session:
+    """One player's game. Feed it lines, it returns what to send back.
+
+    Questions like "which item?" are kept as state between lines instead of blocking."""
+    def __init__(self):
+        self.model = index.Model()
+        self.view = BufferView(model=self.model)
+        self.controller = index.Controller(self.model, self.view)
+        for command in local_only:
+            self.controller.commands.pop(command)
+            self.controller.descriptions.pop(command)
+        self.controller.start_game()
+        # what the next line answers: the name, a command, or an item index (a callable)
+        self.awaiting = "name"
+        self.over = False
+
+    def greeting(self):
+        self.view.new_game_screen()
+        self.view.print_board()
+        return self.view.take() + "Name your character:"
+
+    def feed(self, line):
+        """Handle one line from the player and return the reply."""
+        if self.awaiting == "name":
+            if line:
+                self.model.player.name = line
+            self.awaiting = "command"
+        elif callable(self.awaiting):
+            self.awaiting(line)
+            self.awaiting = "command"
+            self.controller.handle(None)
+        elif line in self.controller.prompts:
+            show, question, answer = self.controller.prompts[line]
+            show()
+            self.awaiting = answer
+            return self.view.take() + question
+        elif self.controller.handle(line):
+            # the caller finishes the game with finish()
+            self.over = True
+            return self.view.take()
+        return self.view.take() + "\nChoose an action or 'help':"
+
+    def finish(self):
+        """Record the score of a game that's over and return the high score table. This
+        locks and writes the score files, so it belongs off the event loop."""
+        self.controller.save_score()
+        return self.view.take()
+
+
+async def serve_player(reader, writer):
+    session = Session()
+    writer.write(session.greeting().encode())
+    try:
+        while not session.over:
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                break
+            writer.write(session.feed(line.decode(errors="replace").strip()).encode())
+        if session.over:
+            # a slow disk, or another process holding the score lock, mustn't stall every player
+            scores = await asyncio.get_running_loop().run_in_executor(None, session.finish)
+            writer.write(scores.encode())
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def main(host, port):
+    server = await asyncio.start_server(serve_player, host, port, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve games over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port))
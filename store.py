@@ -0,0 +1,156 @@
+"""Creature stats kept in parallel arrays so a whole room can act in a few array operations."""
+import numpy as np
+
+import journal
+
+# flags
+ALIVE = 1
+AGGRESSIVE = 2
+
+
+class CreatureStore:
+    """Parallel arrays of hp, damage, armor, row, col and flags, one slot per creature.
+
+    Creatures added to the store become thin views over their slot (see creatures.Creature)."""
+    def __init__(self, capacity=64):
+        self.hp = np.zeros(capacity, dtype=np.float64)
+        self.damage = np.zeros(capacity, dtype=np.float64)
+        self.armor = np.zeros(capacity, dtype=np.float64)
+        self.row = np.zeros(capacity, dtype=np.int32)
+        self.col = np.zeros(capacity, dtype=np.int32)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.eid = np.zeros(capacity, dtype=np.int32)
+        self.creatures = [None] * capacity
+        self.size = 0
+        self._free = []
+
+    def copy(self, copies):
+        """A copy of the store for copied creatures (copies maps id(creature) to its copy)."""
+        other = CreatureStore.__new__(CreatureStore)
+        for name in ("hp", "damage", "armor", "row", "col", "flags", "eid"):
+            setattr(other, name, getattr(self, name).copy())
+        other.creatures = [None if x is None else copies[id(x)] for x in self.creatures]
+        for creature in other.creatures:
+            if creature is not None:
+                creature._store = other
+        other.size = self.size
+        other._free = list(self._free)
+        return other
+
+    def _grow(self):
+        capacity = 2 * len(self.hp)
+        journal.keep(self.creatures)
+        for name in ("hp", "damage", "armor", "row", "col", "flags", "eid"):
+            journal.attr(self, name)
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self.creatures += [None] * (capacity - len(self.creatures))
+
+    def add(self, creature):
+        """Move a creature's stats into a free slot."""
+        if creature._store is self:
+            return
+        if creature._store is not None:
+            creature._store.remove(creature)
+        journal.keep(self._free)
+        journal.attr(self, "size")
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self.size == len(self.hp):
+                self._grow()
+            slot = self.size
+            self.size += 1
+        if journal.recording():
+            self._note(slot, creature)
+        self.hp[slot] = creature._hp
+        self.damage[slot] = creature._damage
+        self.armor[slot] = creature._armor
+        self.flags[slot] = ALIVE | (AGGRESSIVE if creature._aggressive else 0)
+        self.eid[slot] = creature.eid
+        if creature._pos is not None:
+            self.row[slot], self.col[slot] = creature._pos
+        self.creatures[slot] = creature
+        creature._store = self
+        creature._slot = slot
+
+    def _note(self, slot, creature):
+        """Journal a slot and the creature about to move in or out of it."""
+        for name in ("hp", "damage", "armor", "row", "col", "flags", "eid"):
+            journal.item(getattr(self, name), slot)
+        journal.item(self.creatures, slot)
+        for name in ("_hp", "_damage", "_armor", "_aggressive", "_store", "_slot"):
+            journal.attr(creature, name)
+
+    def remove(self, creature):
+        """Hand a creature its stats back and free its slot."""
+        slot = creature._slot
+        if journal.recording():
+            self._note(slot, creature)
+            journal.keep(self._free)
+        creature._hp = float(self.hp[slot])
+        creature._damage = float(self.damage[slot])
+        creature._armor = float(self.armor[slot])
+        creature._aggressive = bool(self.flags[slot] & AGGRESSIVE)
+        self.flags[slot] = 0
+        self.creatures[slot] = None
+        self._free.append(slot)
+        creature._store = None
+        creature._slot = None
+
+    def chase(self, board, target, field, slots=None):
+        """Step every live aggressive creature one tile toward target, all at once.
+
+        Each chaser takes the step the shared FlowField gives it, so chasers route around
+        each other instead of bumping. A chaser whose step lands on target attacks it
+        instead of moving. If two chasers want the same cell the lower slot gets it and the
+        other waits. Only the given slots act, if slots is given.
+        Returns (movers, attackers) as arrays of slots."""
+        if slots is None:
+            active = np.flatnonzero((self.flags[:self.size] & (ALIVE | AGGRESSIVE)) == (ALIVE | AGGRESSIVE))
+        else:
+            active = np.sort(np.asarray(slots, dtype=np.int64))
+        active = active[self.eid[active] != target.eid]
+        r = self.row[active]
+        c = self.col[active]
+        dr, dc = field.steps(board, r, c, target.pos)
+        nr = r + dr
+        nc = c + dc
+
+        hits = (nr == target.pos[0]) & (nc == target.pos[1])
+        stepping = (dr != 0) | (dc != 0)
+        want = np.flatnonzero(~hits & stepping)
+        # lowest slot wins a contested cell
+        cells = nr[want] * board.shape[1] + nc[want]
+        _, first = np.unique(cells, return_index=True)
+        won = want[np.sort(first)]
+
+        movers = active[won]
+        occupant = board.layer("occupant")
+        cells = list(zip(r[won].tolist(), c[won].tolist())) + list(zip(nr[won].tolist(), nc[won].tolist()))
+        if journal.recording():
+            journal.note(board.dirty.update, cells)
+            journal.item(occupant, (r[won], c[won]))
+            journal.item(occupant, (nr[won], nc[won]))
+            journal.item(self.row, movers)
+            journal.item(self.col, movers)
+            for slot in movers:
+                journal.attr(self.creatures[slot], "_pos")
+        occupant[r[won], c[won]] = 0
+        occupant[nr[won], nc[won]] = self.eid[movers]
+        board.dirty.update(cells)
+        self.row[movers] = nr[won]
+        self.col[movers] = nc[won]
+        for slot in movers:
+            self.creatures[slot]._pos = (int(self.row[slot]), int(self.col[slot]))
+        return movers, active[hits]
+
+    def exchange(self, attackers, defender):
+        """Every attacker trades one round of blows with defender: hp -= damage / armor."""
+        d = defender._slot
+        journal.item(self.hp, attackers)
+        journal.item(self.hp, d)
+        self.hp[attackers] -= self.damage[d] / self.armor[attackers]
+        self.hp[d] -= self.damage[attackers].sum() / self.armor[d]
@@ -0,0 +1,111 @@
+"""Opt-in structured game events, for analysing sessions without scraping what View prints.
+
+Controller keeps a Telemetry in `telemetry` (None when it's off, which costs one truth test
+per event). The game thread only appends to an in-memory ring buffer, a background thread
+writes the buffer out in batches as JSON lines, one event per line:
+
+    {"ts": 1760000000.0, "turn": 12, "event": "attack", "attacker": 7, "defender": 3, ...}
+
+The file rotates at `max_bytes`, keeping `backups` old files (events.jsonl, events.1.jsonl,
+...). The game never waits for the disk: when the writer falls behind, frequent events (moves)
+are sampled once the buffer is three quarters full, and once it's full the oldest events are
+dropped. The writer notes how many were lost in a "dropped" event.
+"""
+import collections
+import json
+import os
+import threading
+import time
+
+# events kept only one in `sample` when the buffer is filling up
+sampled = frozenset({"move"})
+
+
+class Telemetry:
+    def __init__(self, directory, capacity=8192, batch=512, interval=0.25,
+                 max_bytes=16 * 2**20, backups=5, sample=8):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "events.jsonl")
+        self.capacity = capacity
+        self.batch = batch
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.sample = sample
+        # deque appends and pops are atomic, so the game and the writer share it without a lock
+        self.buffer = collections.deque(maxlen=capacity)
+        self.high_water = capacity * 3 // 4
+        self.emitted = 0
+        # lost to a full buffer, and left out by sampling
+        self.dropped = 0
+        self.skipped = 0
+        self.written = 0
+        self._reported = 0
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._writer.start()
+
+    def emit(self, event, turn, **fields):
+        """Queue an event. Never blocks, an event that doesn't fit is dropped."""
+        self.emitted += 1
+        n = len(self.buffer)
+        if n >= self.high_water and event in sampled and self.emitted % self.sample:
+            self.skipped += 1
+            return
+        if n == self.capacity:
+            self.dropped += 1
+        self.buffer.append((time.time(), turn, event, fields))
+
+    def flush(self):
+        """Write out everything buffered so far (the writer thread calls this)."""
+        lines = []
+        while True:
+            try:
+                ts, turn, event, fields = self.buffer.popleft()
+            except IndexError:
+                break
+            lines.append(json.dumps({"ts": ts, "turn": turn, "event": event, **fields}))
+            if len(lines) == self.batch:
+                self._write(lines)
+                lines = []
+        lost = self.dropped + self.skipped
+        if lost > self._reported:
+            lines.append(json.dumps({"ts": time.time(), "event": "dropped", "count": lost - self._reported}))
+            self._reported = lost
+        if lines:
+            self._write(lines)
+        self._file.flush()
+
+    def close(self):
+        """Stop the writer and write out what's left."""
+        self._stop.set()
+        self._writer.join()
+        self.flush()
+        self._file.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def _write(self, lines):
+        text = "\n".join(lines) + "\n"
+        if self._file.tell() and self._file.tell() + len(text) > self.max_bytes:
+            self._rotate()
+        self._file.write(text)
+        self.written += len(lines)
+
+    def _rotate(self):
+        """events.jsonl becomes events.1.jsonl, events.1.jsonl events.2.jsonl and so on."""
+        self._file.close()
+        base, ext = os.path.splitext(self.path)
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{base}.{i}{ext}"
+            if os.path.exists(older):
+                os.replace(older, f"{base}.{i + 1}{ext}")
+        if self.backups:
+            os.replace(self.path, f"{base}.1{ext}")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
@@ -0,0 +1,66 @@
+import board as b
+import gear as g
+import index
+
+
+class TestBoard:
+    def setup_method(self):
+        self.model = index.Model()
+        self.view = index.View(model=self.model)
+        self.controller = index.Controller(self.model, self.view)
+
+    def test_layers_follow_moves(self):
+        """The occupant layer should follow the player around."""
+        player = self.model.player
+        assert self.model.board.occupant_at((4, 2)) is player
+        self.controller.move(player, "w")
+        assert self.model.board.occupant[4, 2] == 0
+        assert self.model.board.occupant_at((3, 2)) is player
+
+    def test_walls_block_moves(self):
+        player = self.model.player
+        self.model.board.set_terrain((3, 2), b.WALL)
+        self.controller.move(player, "w")
+        assert player.pos == (4, 2)
+        assert self.model.board.occupant_at((4, 2)) is player
+
+    def test_death_clears_cell(self):
+        """Dead creatures should leave the occupant layer."""
+        self.controller.create_creature()
+        goblin = self.model.creatures[-1]
+        goblin.pos = (3, 2)
+        goblin.hp = 1
+        self.controller.attack(self.model.player, goblin)
+        assert self.model.board.occupant[3, 2] == 0
+        assert goblin.board is None
+
+    def test_extend_places_in_bulk(self):
+        swords = [g.Sword() for i in range(3)]
+        for i, sword in enumerate(swords):
+            sword.pos = (0, i)
+        self.model.floor_items.extend(swords)
+        board = self.model.board
+        assert [board.item_at((0, i)) for i in range(3)] == swords
+        assert all(x.board is board for x in swords)
+        assert {(0, 0), (0, 1), (0, 2)} <= board.dirty
+
+    def test_stacked_items(self):
+        """Items dropped on the same cell should be picked up one after another."""
+        sword = g.Sword()
+        shield = g.Shield()
+        sword.pos = (4, 2)
+        shield.pos = (4, 2)
+        self.model.floor_items.extend([sword, shield])
+        self.controller.pickup(self.model.player)
+        assert sword in self.model.player.items
+        assert self.model.board.item_at((4, 2)) is shield
+        self.controller.pickup(self.model.player)
+        assert shield in self.model.player.items
+        assert self.model.board.item[4, 2] == 0
+
+    def test_reset_board(self):
+        """A new room should start out with only the player on the board."""
+        self.controller.populate_room()
+        self.model.reset_board()
+        assert list(self.model.board.entities.values()) == [self.model.player]
+        assert self.model.board.terrain[0, 2] == b.EXIT
@@ -0,0 +1,159 @@
+import copy
+import random
+
+import pytest
+
+import effects
+import gear as g
+import index
+import journal
+import levels
+import placement
+import replay
+import rng
+from custom_exceptions import DeathError
+
+
+def fingerprint(model):
+    """Everything a rollback has to put back, in comparable form."""
+    board = model.board
+    return (
+        replay.state_hash(model),
+        model.turn,
+        model.level,
+        board.occupant.tobytes(),
+        board.item.tobytes(),
+        board.terrain.tobytes(),
+        sorted(board.entities),
+        [x.eid for x in model.creatures],
+        [x.eid for x in model.floor_items],
+        sorted((t, x.eid) for t, seq, x in model.scheduler.heap),
+        sorted((t, x.eid, e.name) for t, seq, x, e in model.effects.heap),
+        [(x.hp, x.damage, x.armor, x.pos) for x in model.creatures],
+        [getattr(model.rng, name).random() for name in rng.names],
+    )
+
+
+def play(controller, moves):
+    for wasd in moves:
+        try:
+            controller.round(wasd)
+        except DeathError:
+            return
+
+
+class TestClone:
+    def setup_game(self, store):
+        self.model = index.Model(store=store, seed=5)
+        self.controller = index.Controller(self.model, index.NullView(model=self.model))
+        self.controller.start_game()
+        self.controller.populate_room(density=0.1)
+        for pos in placement.sample(self.model.board, 3, self.model.rng.placement.generator):
+            potion = g.StrengthPotion()
+            potion.pos = pos
+            self.model.floor_items.append(potion)
+
+    def teardown_method(self):
+        journal.stop()
+
+    @pytest.mark.parametrize("store", [False, True])
+    def test_rollback(self, store):
+        self.setup_game(store)
+        walk = random.Random(1)
+        checkpoint = self.model.checkpoint()
+        before = fingerprint(self.model)
+        self.model.rollback(checkpoint)
+        for attempt in range(5):
+            moves = walk.choices("wasd", k=30)
+            play(self.controller, moves)
+            self.model.rollback(checkpoint)
+            assert fingerprint(self.model) == before
+            self.model.rollback(checkpoint)
+        self.model.commit()
+        assert not journal.recording()
+
+    def test_nested_checkpoints(self):
+        self.setup_game(False)
+        outer = self.model.checkpoint()
+        before = fingerprint(self.model)
+        self.model.rollback(outer)
+        play(self.controller, "ddss")
+        inner = self.model.checkpoint()
+        middle = fingerprint(self.model)
+        self.model.rollback(inner)
+        play(self.controller, "aaww")
+        self.model.rollback(inner)
+        assert fingerprint(self.model) == middle
+        self.model.rollback(outer)
+        assert fingerprint(self.model) == before
+
+    @pytest.mark.parametrize("store", [False, True])
+    def test_rollback_new_level(self, store):
+        self.setup_game(store)
+        checkpoint = self.model.checkpoint()
+        before = fingerprint(self.model)
+        self.model.rollback(checkpoint)
+        board = self.model.board
+        self.controller.new_level()
+        play(self.controller, "wasd")
+        assert self.model.board is not board
+        self.model.rollback(checkpoint)
+        assert self.model.board is board
+        assert self.model.player.board is board
+        assert fingerprint(self.model) == before
+
+    def test_level_cache_builds_while_recording(self):
+        self.setup_game(False)
+        checkpoint = self.model.checkpoint()
+        cache = levels.LevelCache(3, ahead=2)
+        try:
+            with cache._cond:
+                cache._cond.wait_for(lambda: len(cache.ready) == 2, timeout=10)
+            self.model.rollback(checkpoint)
+            board, creatures = cache.take(2)
+        finally:
+            cache.close()
+        assert cache.hits == 1
+        # the worker's rooms aren't part of this game's log, rolling back leaves them be
+        fresh = levels.generate(levels.level_seed(3, 2))[1]
+        assert [(type(x), x.pos, x.aggressive) for x in creatures] == \
+            [(type(x), x.pos, x.aggressive) for x in fresh]
+        assert all(x.pos is not None for x in creatures)
+
+    def test_effects_roll_back(self):
+        self.setup_game(False)
+        player = self.model.player
+        damage = player.damage
+        checkpoint = self.model.checkpoint()
+        self.model.effects.add(player, effects.Effect("rage", damage=2), 3)
+        assert player.damage == damage + 2
+        self.model.rollback(checkpoint)
+        assert player.damage == damage
+        assert player.effects == ()
+        assert len(self.model.effects) == 0
+
+    @pytest.mark.parametrize("store", [False, True])
+    def test_clone_is_independent(self, store):
+        self.setup_game(store)
+        state = self.model.rng.getstate()
+        before = fingerprint(self.model)
+        self.model.rng.setstate(state)
+        other = self.model.clone()
+        assert other.board.terrain is self.model.board.terrain
+        assert replay.state_hash(other) == replay.state_hash(self.model)
+        view = index.NullView(model=other)
+        play(index.Controller(other, view), "ddddssss")
+        assert other.turn > 0
+        assert fingerprint(self.model) == before
+        # and the original plays on as if the clone never happened
+        play(self.controller, "ss")
+        assert self.model.turn == 2
+
+    def test_clone_matches_deepcopy(self):
+        self.setup_game(False)
+        play(self.controller, "dd")
+        deep = copy.deepcopy(self.model)
+        quick = self.model.clone()
+        for model in (deep, quick):
+            play(index.Controller(model, index.NullView(model=model)), "ssddwa")
+        assert replay.state_hash(deep) == replay.state_hash(quick)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import combat
+import creatures as c
+import gear as g
+import index
+from custom_exceptions import DeathError
+
+
+def fight(player_stats, creature_type):
+    """Play the fight out with Controller.attack. Returns (rounds, winner, player hp, creature hp)."""
+    model = index.Model()
+    controller = index.Controller(model, index.NullView(model=model))
+    player = model.player
+    player.hp, player.damage, player.armor = player_stats
+    creature = creature_type()
+    creature.pos = (3, 2)
+    model.add_creature(creature)
+    rounds = 0
+    while rounds < 1000:
+        rounds += 1
+        try:
+            controller.attack(player, creature)
+        except DeathError:
+            winner = combat.BOTH if creature not in model.creatures else combat.DEFENDER
+            return rounds, winner, player.hp, creature.hp
+        if creature not in model.creatures:
+            return rounds, combat.ATTACKER, player.hp, creature.hp
+    return combat.NEVER, combat.NOBODY, player.hp, creature.hp
+
+
+def test_matches_the_game():
+    tables = combat.build_tables(hps=[1, 4, 10], types=[c.Goblin, c.Troll])
+    names, bonuses = combat.loadouts()
+    for i, (damage, armor) in enumerate(bonuses):
+        for j, hp in enumerate(tables["hp"]):
+            for k, creature_type in enumerate([c.Goblin, c.Troll]):
+                rounds, winner, player_hp, creature_hp = fight((hp, 3 + damage, 2 + armor), creature_type)
+                assert tables["rounds"][i, j, k] == rounds
+                assert tables["winner"][i, j, k] == winner
+                assert np.isclose(tables["attacker_hp"][i, j, k], player_hp)
+                assert np.isclose(tables["defender_hp"][i, j, k], creature_hp)
+
+
+def test_loadouts():
+    names, bonuses = combat.loadouts()
+    # sword, shield, helm and breastplate are each worn or not
+    assert len(names) == 16
+    assert "sword+shield" in names
+    assert tuple(bonuses[names.index("sword+shield")]) == (g.Sword.damage, g.Shield.armor)
+
+
+def test_stalemate():
+    attacker = np.array([(10, 0, 2)], dtype=combat.stats)
+    defender = np.array([(10, 0, 2)], dtype=combat.stats)
+    result = combat.solve(attacker, defender)
+    assert result["rounds"][0] == combat.NEVER
+    assert result["winner"][0] == combat.NOBODY
+
+
+def test_save_and_lookup(tmp_path):
+    tables = combat.build_tables()
+    combat.save(tmp_path / "matchups.npz", tables)
+    loaded = combat.load(tmp_path / "matchups.npz")
+    assert (loaded["winner"] == tables["winner"]).all()
+    outcome = combat.lookup(loaded, "sword+shield", 10, "Goblin")
+    assert outcome["winner"] == combat.ATTACKER
+    # the goblin (10 hp, 2 armor) takes 8 / 2 a round and dies below 0
+    assert outcome["rounds"] == 3
+    for hp in (4.5, 11, 0):
+        with pytest.raises(ValueError):
+            combat.lookup(loaded, "sword+shield", hp, "Goblin")
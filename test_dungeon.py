@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+import dungeon
+import gear as g
+import index
+import levels
+
+
+def step_onto(controller, target):
+    """Put the player next to target (on a free cell) and walk onto it."""
+    board = controller.model.board
+    for wasd, (dr, dc) in {"w": (-1, 0), "a": (0, -1), "s": (1, 0), "d": (0, 1)}.items():
+        start = (target[0] - dr, target[1] - dc)
+        if board.in_bounds(start) and board.occupant_at(start) is None:
+            controller.model.player.pos = start
+            controller.move(controller.model.player, wasd)
+            return
+    raise AssertionError(f"no way onto {target}")
+
+
+def layout(model):
+    return sorted((type(x).__name__, x.pos, x.hp) for x in model.creatures if x is not model.player)
+
+
+@pytest.mark.parametrize("store", [False, True])
+def test_walk_down_and_back(tmp_path, store):
+    model = index.Model(store=store)
+    controller = index.Controller(model, index.NullView(model=model))
+    controller.levels = levels.LevelCache(3, ahead=0)
+    controller.dungeon = dungeon.Dungeon(controller.levels, resident=1, directory=str(tmp_path))
+    controller.start_game()
+    spear = g.Spear()
+    spear.pos = (2, 2)
+    model.floor_items.append(spear)
+    seen = {1: layout(model)}
+    for level in range(2, 5):
+        controller.new_level()
+        assert model.level == level
+        seen[level] = layout(model)
+        assert len(controller.dungeon.rooms) <= 1
+    assert sorted(os.listdir(tmp_path)) == ["room1.srpg", "room2.srpg"]
+
+    for level in (3, 2, 1):
+        step_onto(controller, model.board.entrance)
+        assert model.level == level
+        assert model.player.pos == model.board.exit
+        assert layout(model) == seen[level]
+        for creature in model.creatures:
+            assert model.board.occupant_at(creature.pos) is creature
+    assert [(type(x), x.pos) for x in model.floor_items] == [(g.Spear, (2, 2))]
+    assert controller.dungeon.loads == 2
+
+    # and back down to a room that never left memory
+    step_onto(controller, model.board.exit)
+    assert model.level == 2
+    assert model.player.pos == model.board.entrance
+    assert layout(model) == seen[2]
+    controller.dungeon.close()
+    assert not os.path.exists(tmp_path)
@@ -0,0 +1,57 @@
+import effects
+import gear as g
+import index
+
+
+class TestEffects:
+    def setup_method(self):
+        self.model = index.Model()
+        self.view = index.NullView(model=self.model)
+        self.controller = index.Controller(self.model, self.view)
+        self.player = self.model.player
+
+    def test_potion_wears_off(self):
+        potion = g.StrengthPotion()
+        self.player.items.append(potion)
+        self.controller.quaff(self.player, potion)
+        assert self.player.damage == 8
+        for i in range(potion.turntimer):
+            assert self.player.damage == 8
+            self.controller.round("a" if i % 2 else "d")
+        assert self.player.damage == 3
+        assert self.player.effects == []
+        assert len(self.model.effects) == 0
+
+    def test_stats_are_derived(self):
+        sword = g.Sword()
+        self.player.items.append(sword)
+        self.controller.equip(self.player, sword)
+        self.model.effects.add(self.player, effects.Effect("rage", damage=1, armor=1), 5)
+        assert (self.player.damage, self.player.armor) == (9, 3)
+        # setting a stat moves the base, the bonuses stay on top
+        self.player.damage = 20
+        assert self.player.base_damage == 14
+        self.controller.unequip(self.player, sword)
+        assert self.player.damage == 15
+
+    def test_only_due_effects_are_touched(self):
+        self.controller.populate_room(density=0.2)
+        goblins = self.model.creatures[1:]
+        for i, goblin in enumerate(goblins):
+            self.model.effects.add(goblin, effects.Effect("stoneskin", armor=10), 1000)
+        self.model.effects.add(goblins[0], effects.Effect("haste", damage=2), 3)
+        assert self.model.effects.expire(2) == []
+        assert [effect.name for creature, effect in self.model.effects.expire(3)] == ["haste"]
+        assert len(self.model.effects) == len(goblins)
+        assert goblins[0].damage == 3
+        assert goblins[0].armor == 12
+
+    def test_store_sees_the_totals(self):
+        model = index.Model(store=True)
+        controller = index.Controller(model, index.NullView(model=model))
+        controller.create_creature()
+        goblin = model.creatures[-1]
+        model.effects.add(goblin, effects.Effect("rage", damage=4), 5)
+        assert model.store.damage[goblin._slot] == 7
+        model.effects.expire(5)
+        assert model.store.damage[goblin._slot] == 3
@@ -0,0 +1,82 @@
+import numpy as np
+
+import creatures as c
+import env
+import gear as g
+
+
+def test_observations_are_reused():
+    batch = env.BatchEnv(3)
+    obs = batch.reset(seed=1)
+    assert obs["terrain"].shape == (3, 5, 5)
+    # the player is on the entrance of every game
+    assert (obs["occupant"][:, 4, 2] == c.Player.type_id + 1).all()
+    assert (obs["player"][:, env.stats.index("hp")] == 10).all()
+    terrain = obs["terrain"]
+    obs2, reward, done, info = batch.step(np.array([0, 1, 3]))
+    assert obs2 is obs and obs2["terrain"] is terrain
+    assert (obs["player"][:, env.stats.index("turn")] == 1).all()
+
+
+def test_same_seed_same_games():
+    runs = []
+    for attempt in range(2):
+        batch = env.BatchEnv(4)
+        batch.reset(seed=7)
+        moves = np.random.default_rng(0).integers(0, 4, size=(30, 4))
+        for step in moves:
+            obs, reward, done, info = batch.step(step)
+        runs.append({k: v.copy() for k, v in obs.items()})
+    for key in runs[0]:
+        assert (runs[0][key] == runs[1][key]).all()
+
+
+def test_items_and_endings():
+    batch = env.BatchEnv(2, max_steps=5)
+    batch.reset(seed=3)
+    helm = g.Helm()
+    batch.games[0].model.player.items.append(helm)
+    equip = env.actions.index("e")
+    # the sword and shield were equipped at the start, so the helm is item 0
+    batch.step(np.array([equip, 0]), items=np.array([0, 0]))
+    assert helm in batch.games[0].model.player.equipment
+    assert batch.obs["player"][0, env.stats.index("armor")] == 12
+
+    # game 1 dies on its next fight
+    model = batch.games[1].model
+    model.player.hp = 0.01
+    for creature in model.creatures[1:]:
+        creature.pos = (3, 2)
+        break
+    obs, reward, done, info = batch.step(np.array([1, 0]))
+    assert list(done) == [False, True]
+    assert info[1]["cause"] == "killed"
+    # a fresh game took its place
+    assert batch.games[1].model is not model
+    assert obs["player"][1, env.stats.index("turn")] == 0
+
+    # game 0 has taken 2 steps (equipping took no turn, but is a step), 3 more run it out
+    for i in range(3):
+        assert not done[0]
+        obs, reward, done, info = batch.step(np.array([1, 3]))
+    assert done[0] and info[0]["cause"] == "timeout" and info[0]["steps"] == 5
+
+
+def test_equipping_forever_times_out():
+    batch = env.BatchEnv(1, max_steps=3)
+    batch.reset(seed=0)
+    unequip = env.actions.index("u")
+    for i in range(3):
+        obs, reward, done, info = batch.step(np.array([unequip]))
+    assert done[0] and info[0]["cause"] == "timeout" and info[0]["turns"] == 0
+
+
+def test_other_shapes():
+    batch = env.BatchEnv(2, shape=(7, 9))
+    obs = batch.reset(seed=2)
+    assert obs["terrain"].shape == (2, 7, 9)
+    assert (obs["occupant"][:, 6, 4] == c.Player.type_id + 1).all()
+    model = batch.games[0].model
+    model.player.pos = (1, 4)
+    batch.step(np.array([env.actions.index("w"), 0]))
+    assert model.level == 2 and model.board.shape == (7, 9)
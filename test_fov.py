@@ -0,0 +1,78 @@
+import io
+
+import board as b
+import creatures as c
+import fov
+import index
+import render
+
+
+def walled_board():
+    """A 9x9 room cut in two by a wall along row 4, with a gap at column 8."""
+    board = b.Board((9, 9), (8, 4), (0, 4))
+    board.set_terrain((4, slice(0, 8)), b.WALL)
+    return board
+
+
+def test_walls_block_sight():
+    board = walled_board()
+    visible = fov.field_of_view(board.terrain, (6, 4), radius=10)
+    assert visible[6, 4] and visible[8, 0] and visible[5, 8]
+    # the wall itself is seen, what's behind it isn't
+    assert visible[4, 4]
+    assert not visible[2, 4]
+    assert not visible[0, 0]
+    # radius limits how far
+    assert not fov.field_of_view(board.terrain, (6, 4), radius=1)[8, 4]
+
+
+def test_cache():
+    board = walled_board()
+    field = fov.FieldOfView()
+    first = field.visible(board, (6, 4))
+    assert field.visible(board, (6, 4)) is first
+    field.visible(board, (7, 4))
+    assert field.visible(board, (6, 4)) is first
+    assert field.computed == 2
+    board.set_terrain((4, 0), b.FLOOR)
+    assert field.visible(board, (6, 4)) is not first
+    assert field.computed == 3
+
+
+class TestSight:
+    def setup_method(self):
+        self.model = index.Model()
+        self.model.reset_board(walled_board())
+        self.controller = index.Controller(self.model, index.NullView(model=self.model))
+        self.goblin = c.Goblin()
+        self.goblin.pos = (1, 4)
+        self.model.add_creature(self.goblin)
+
+    def test_hidden_creatures_stay_put(self):
+        self.controller.round("a")
+        self.controller.round("d")
+        assert self.goblin.pos == (1, 4)
+        assert len(self.model.scheduler) == 0
+
+    def test_seeing_the_player_wakes(self):
+        self.model.player.pos = (6, 8)
+        self.goblin.pos = (3, 8)
+        self.controller.round("w")
+        assert self.goblin.pos == (4, 8)
+
+    def test_fog_of_war(self):
+        out = io.StringIO()
+        renderer = render.TerminalRenderer(self.model, out=out, fov=self.controller.fov)
+        renderer.render()
+        assert renderer.frame[1, 4] == " "
+        assert renderer.frame[8, 4] == "P"
+        self.model.player.pos = (5, 8)
+        self.controller.move(self.model.player, "w")
+        renderer.render()
+        # the goblin came into view
+        assert renderer.frame[1, 4] == "G"
+        self.controller.move(self.model.player, "s")
+        self.controller.move(self.model.player, "a")
+        renderer.render()
+        # out of sight again, only the floor is remembered
+        assert renderer.frame[1, 4] == "."
@@ -0,0 +1,23 @@
+import pytest
+
+import creatures as c
+import gear as g
+
+
+def test_gear_prototypes():
+    """Gear constants live on the shared type, instances only hold their own state."""
+    sword = g.Sword()
+    assert not hasattr(sword, "__dict__")
+    assert sword.damage == g.Sword.damage == 5
+    with pytest.raises(AttributeError):
+        sword.damage = 100
+    assert g.gear_types[sword.type_id] is g.Sword
+
+    potion = g.HealthPotion()
+    potion.turntimer = 3
+    assert g.HealthPotion().turntimer == 0
+
+
+def test_creature_slots():
+    assert not hasattr(c.Goblin(), "__dict__")
+    assert not hasattr(c.Player(), "__dict__")
@@ -5,6 +5,7 @@ import pytest
 
 import creatures as c
 import gear as g
+import rng
 from unittest import mock
 from custom_exceptions import *
 
@@ -47,11 +48,10 @@ class TestEmpty:
         assert sword not in self.model.floor_items
         assert sword in self.model.player.items
 
-    # TODO use mock.patch to test the random drops.
-    @mock.patch("numpy.random.randint", unittest.mock.Mock(return_value=1))
-    # @mock.patch("numpy.random.randint", unittest.mock.Mock(side_effect=[0, 1]))
     def test_floor_items(self):
         """Gear should be dropped on the floor when flip lands heads, but not tails."""
+        # every flip lands heads
+        self.model.rng.combat = rng.Fixed([1])
         # Create char
         sword = g.Sword()
         shield = g.Shield()
@@ -199,6 +199,11 @@ class TestEmpty:
 
 class TestPopulated:
     """These tests need a normal populated level."""
+    @pytest.fixture(autouse=True)
+    def scores_dir(self, tmp_path, monkeypatch):
+        """Keep game-over scores out of the real high score files."""
+        monkeypatch.chdir(tmp_path)
+
     def setup_method(self):
         self.model = index.Model()
         self.view = index.View(model=self.model)
@@ -233,4 +238,48 @@ class TestPopulated:
         commands = iter(["w", "a", "s", "d", "exit"])
         index.input = lambda _: next(commands)
         # This should not run forever but I don't know how to check.
-        self.controller.interface()
\ No newline at end of file
+        self.controller.interface()
+
+def test_lazy_imports():
+    """Starting a game shouldn't pull in anything only needed later (or never)."""
+    import subprocess
+    import sys
+    code = "import sys, index; print(sorted({'pandas', 'scores', 'render'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+class CountingOut:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+
+    def flush(self):
+        pass
+
+
+def test_one_write_per_turn():
+    """A turn's messages and board go out in a single write."""
+    model = index.Model()
+    out = CountingOut()
+    view = index.View(model=model, out=out)
+    controller = index.Controller(model, view)
+    controller.populate_room()
+    controller.handle("a")
+    assert len(out.writes) == 1
+    assert "moves towards you!" in out.writes[0]
+    assert out.writes[0].rstrip().endswith("level: 1")
+
+
+def test_null_view_skips_formatting():
+    """A NullView never has its creatures' reprs (or anything else) formatted."""
+    model = index.Model()
+    controller = index.Controller(model, index.NullView(model=model))
+    controller.populate_room()
+    formatted = []
+    goblin_type = type(model.creatures[1])
+    with mock.patch.object(goblin_type, "__repr__", lambda self: formatted.append(self) or "G"):
+        controller.handle("a")
+    assert formatted == []
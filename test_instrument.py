@@ -0,0 +1,47 @@
+import index
+import instrument
+
+
+class TestProfiler:
+    def setup_method(self):
+        self.model = index.Model()
+        self.view = index.NullView(model=self.model)
+        self.controller = index.Controller(self.model, self.view)
+        self.controller.populate_room()
+        for creature in self.model.creatures:
+            creature.hp = 1e9
+
+    def test_off_by_default(self):
+        assert self.controller.profiler is None
+        self.controller.round("a")
+
+    def test_turns_are_recorded(self, tmp_path):
+        self.controller.profiler = instrument.TurnProfiler(size=8)
+        for wasd in "adadadadadad":
+            self.controller.round(wasd)
+        prof = self.controller.profiler
+        rows = prof.rows()
+        assert len(rows) == 8
+        assert list(rows["turn"]) == list(range(4, 12))
+        # only the scheduled chasers are looked at, never the whole room
+        assert (rows["scanned"] == len(self.model.creatures) - 1).all()
+        assert (rows["touched"] == len(self.model.creatures) - 1).all()
+        assert (rows["chase"] > 0).all()
+        assert prof.calls["move"] == 12
+        assert "p99" in prof.stats()
+
+        path = tmp_path / "turns.tsv"
+        prof.dump(path)
+        lines = path.read_text().splitlines()
+        assert lines[0].split("\t")[:3] == ["turn", "move", "pickup"]
+        assert len(lines) == 9
+
+    def test_render_is_charged_to_turns_only(self):
+        prof = self.controller.profiler = instrument.TurnProfiler(size=8)
+        self.controller.handle("a")
+        assert prof.calls["render"] == 1
+        render = prof.rows()["render"].copy()
+        for command in ("inv", "help", "nonsense", None):
+            self.controller.handle(command)
+        assert prof.calls["render"] == 1
+        assert (prof.rows()["render"] == render).all()
@@ -0,0 +1,50 @@
+import index
+import levels
+
+
+def layout(built):
+    board, creatures = built
+    return [(type(x).__name__, x.pos) for x in creatures]
+
+
+def test_generate_is_reproducible():
+    seed = levels.level_seed(7, 3)
+    assert layout(levels.generate(seed)) == layout(levels.generate(seed))
+    assert levels.level_seed(7, 3) != levels.level_seed(7, 4)
+    board, creatures = levels.generate(seed)
+    positions = [x.pos for x in creatures]
+    assert 3 <= len(creatures) <= 7
+    assert len(set(positions)) == len(positions)
+    assert board.entrance not in positions
+
+
+class TestLevelCache:
+    def setup_method(self):
+        self.cache = levels.LevelCache(11, ahead=2)
+
+    def teardown_method(self):
+        self.cache.close()
+
+    def test_cached_levels_match_fresh_ones(self):
+        fresh = levels.LevelCache(11, ahead=0)
+        for level in range(2, 6):
+            assert layout(self.cache.take(level)) == layout(fresh.take(level))
+        assert fresh.hits == 0
+
+    def test_dropping_the_cache_changes_nothing(self):
+        expected = layout(levels.generate(levels.level_seed(11, 3)))
+        self.cache.take(2)
+        self.cache.clear()
+        assert layout(self.cache.take(3)) == expected
+
+    def test_new_level_swaps_in_cached_room(self):
+        model = index.Model()
+        controller = index.Controller(model, index.NullView(model=model))
+        controller.levels = self.cache
+        controller.start_game()
+        expected = layout(levels.generate(levels.level_seed(11, 2)))
+        controller.new_level()
+        assert model.level == 2
+        assert [(type(x).__name__, x.pos) for x in model.creatures[1:]] == expected
+        assert model.board.occupant_at(model.player.pos) is model.player
+        assert len(model.scheduler) == len(expected)
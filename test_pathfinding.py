@@ -0,0 +1,73 @@
+import numpy as np
+
+import board as b
+import creatures as c
+import index
+import pathfinding as pf
+
+
+def test_distance_field_walls():
+    """Distances should go around walls, and walled-off cells are unreachable."""
+    passable = np.ones((3, 5), dtype=bool)
+    passable[0:2, 2] = False
+    passable[2, 4] = False
+    dist = pf.distance_field(passable, (0, 0))
+    assert dist[0, 3] == 7
+    assert dist[0, 2] == pf.UNREACHABLE
+    assert dist[2, 4] == pf.UNREACHABLE
+
+
+class TestFlow:
+    def setup_method(self):
+        self.model = index.Model()
+        self.view = index.View(model=self.model)
+        self.controller = index.Controller(self.model, self.view)
+
+    def test_field_is_shared(self):
+        """A whole round of chasers should cost one field, until the player moves."""
+        self.model.player.pos = (2, 2)
+        for pos in [(0, 0), (0, 4), (4, 0), (4, 4)]:
+            goblin = c.Goblin()
+            goblin.pos = pos
+            self.model.creatures.append(goblin)
+        for creature in self.model.creatures[1:]:
+            self.controller.move_toward(creature, self.model.player)
+        assert self.controller.paths.computed == 1
+        self.model.player.pos = (2, 1)
+        self.controller.move_toward(self.model.creatures[1], self.model.player)
+        assert self.controller.paths.computed == 2
+
+    def test_route_around(self):
+        """A chaser blocked by another creature should take the other way in."""
+        self.model.player.pos = (2, 2)
+        blocker = c.Troll()
+        blocker.pos = (1, 1)
+        goblin = c.Goblin()
+        goblin.pos = (0, 1)
+        self.model.creatures.extend([blocker, goblin])
+        self.controller.move_toward(goblin, self.model.player)
+        assert goblin.pos == (0, 2)
+        assert blocker.hp == 30
+
+    def test_walls(self):
+        self.model.player.pos = (2, 2)
+        self.model.board.set_terrain((1, slice(0, 4)), b.WALL)
+        goblin = c.Goblin()
+        goblin.pos = (0, 0)
+        self.model.creatures.append(goblin)
+        for i in range(5):
+            self.controller.move_toward(goblin, self.model.player)
+        assert goblin.pos == (1, 4)
+
+
+def test_large_board():
+    """The field shouldn't care about the old 5x5 room."""
+    board = b.Board(shape=(200, 300), entrance=(199, 150), exit=(0, 150))
+    field = pf.FlowField()
+    dist = field.update(board, (100, 100))
+    assert dist[0, 0] == 200
+    rows = np.array([0, 199])
+    cols = np.array([100, 299])
+    drow, dcol = field.steps(board, rows, cols, (100, 100))
+    assert list(drow) == [1, -1]
+    assert list(dcol) == [0, 0]
@@ -0,0 +1,42 @@
+import pytest
+
+import board as b
+import index
+import placement
+from custom_exceptions import PlacementError
+
+
+class TestPlacement:
+    def setup_method(self):
+        self.model = index.Model()
+        self.controller = index.Controller(self.model, index.NullView(model=self.model))
+
+    def test_free_cells(self):
+        # 25 cells minus the entrance (where the player is) and the exit
+        assert placement.capacity(self.model.board) == 23
+        # a 1 cell margin clears a 2x3 block around each of them
+        assert placement.capacity(self.model.board, clearance=1) == 13
+        self.model.board.set_terrain((2, 2), b.WALL)
+        assert placement.capacity(self.model.board) == 22
+
+    def test_full_room(self):
+        self.controller.populate_room(density=1)
+        assert len(self.model.creatures) == 24
+        assert placement.capacity(self.model.board) == 0
+        with pytest.raises(PlacementError):
+            self.controller.create_creature()
+        positions = [x.pos for x in self.model.creatures]
+        assert len(set(positions)) == len(positions)
+
+    def test_large_dense_room(self):
+        self.model.reset_board(b.Board((40, 40), (39, 20), (0, 20)))
+        self.controller.populate_room(density=0.9)
+        free = 40 * 40 - 2
+        assert len(self.model.creatures) == 1 + int(0.9 * free)
+        assert self.model.board.terrain[self.model.board.occupant != 0].tolist().count(b.EXIT) == 0
+        with pytest.raises(PlacementError):
+            placement.sample(self.model.board, free)
+
+    def test_bad_density(self):
+        with pytest.raises(ValueError):
+            placement.for_density(self.model.board, 1.5)
@@ -0,0 +1,40 @@
+import io
+
+import index
+import render
+
+
+class TestRenderer:
+    def setup_method(self):
+        self.model = index.Model()
+        self.out = io.StringIO()
+        self.view = index.View(model=self.model, renderer=render.TerminalRenderer(self.model, out=self.out))
+        self.controller = index.Controller(self.model, self.view)
+
+    def frame(self):
+        self.out.seek(0)
+        self.out.truncate()
+        self.view.print_board()
+        return self.out.getvalue()
+
+    def test_only_changes_are_sent(self):
+        first = self.frame()
+        assert ". . > . ." in first
+        assert ". . P . ." in first
+
+        self.controller.move(self.model.player, "w")
+        second = self.frame()
+        assert "\x1b[2J" not in second
+        assert render.move_to(3, 2) + "P" in second
+        assert render.move_to(4, 2) + "<" in second
+        # two cells plus the header's cursor move and line clear
+        assert second.count("\x1b[") == 4
+
+        # nothing moved, only the header goes out
+        assert self.frame().count("\x1b[") == 2
+        assert self.view.renderer.frame[3, 2] == "P"
+
+    def test_new_room_redraws(self):
+        self.frame()
+        self.model.reset_board()
+        assert "\x1b[2J" in self.frame()
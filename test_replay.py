@@ -0,0 +1,68 @@
+import subprocess
+import sys
+
+import dungeon
+import index
+import levels
+import replay
+import replaylog
+
+
+def record_game(path, seed, answers, monkeypatch):
+    """Play a game the way index.py does, typing the given answers."""
+    monkeypatch.setattr(index, "input", lambda prompt: next(answers), raising=False)
+    model = index.Model(seed=seed)
+    view = index.NullView(model=model)
+    controller = index.Controller(model, view)
+    controller.recorder = replaylog.Recorder(path, seed)
+    controller.levels = levels.LevelCache(seed)
+    controller.dungeon = dungeon.Dungeon(controller.levels)
+    controller.save_score = lambda: None
+    controller.start_game()
+    controller.interface()
+    controller.recorder.finish(model)
+    controller.dungeon.close()
+    return model
+
+
+def test_round_trip(tmp_path, monkeypatch):
+    path = tmp_path / "game.replay"
+    answers = iter(["Tester", "w", "a", "u", "0", "e", "0", "d", "w", "w", "w", "exit"])
+    model = record_game(path, 99, answers, monkeypatch)
+
+    seed, recorded, files, expected = replay.read(path)
+    assert seed == 99
+    assert recorded[:5] == ["Tester", "w", "a", "u", "0"]
+    ok, replayed, elapsed = replay.check(path)
+    assert ok
+    assert replayed.turn == model.turn
+    assert replayed.player.name == "Tester"
+
+
+def test_mismatch(tmp_path, monkeypatch):
+    path = tmp_path / "game.replay"
+    record_game(path, 5, iter(["Tester", "w", "w", "exit"]), monkeypatch)
+    text = path.read_text().replace("seed 5", "seed 6")
+    path.write_text(text)
+    ok, replayed, elapsed = replay.check(path)
+    assert not ok
+
+
+def test_load_is_replayed_from_the_log(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "game.replay"
+    model = record_game(path, 7, iter(["Tester", "w", "save", "d", "d", "load", "a", "load", "exit"]),
+                        monkeypatch)
+    (tmp_path / "savegame.srpg").unlink()
+    seed, answers, files, expected = replay.read(path)
+    assert len(files) == 2 and files[0] == files[1]
+    ok, replayed, elapsed = replay.check(path)
+    assert ok
+    assert replayed.turn == model.turn
+
+
+def test_recording_does_not_import_index_again():
+    """index.py records itself, a second import of index would be a second copy of the game."""
+    code = "import replaylog, sys; print('index' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          check=True).stdout.strip() == "False"
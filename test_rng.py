@@ -0,0 +1,54 @@
+import index
+import rng
+
+
+def draws(stream, n=50):
+    return [stream.below(10) for i in range(n)]
+
+
+def test_same_seed_same_streams():
+    a, b = rng.Rng(7), rng.Rng(7)
+    for name in rng.names:
+        assert draws(getattr(a, name)) == draws(getattr(b, name))
+    assert draws(rng.Rng(8).combat) != draws(rng.Rng(7).combat)
+
+
+def test_streams_are_independent():
+    a, b = rng.Rng(7), rng.Rng(7)
+    # far more combat draws than a block holds, spawning doesn't notice
+    draws(a.combat, 5000)
+    assert draws(a.spawning) == draws(b.spawning)
+
+
+def test_ranges():
+    stream = rng.Rng(1).loot
+    values = [stream.randint(3, 7) for i in range(2000)]
+    assert set(values) == {3, 4, 5, 6, 7}
+    assert {stream.choice("ab") for i in range(100)} == {"a", "b"}
+
+
+def test_state_round_trip():
+    r = rng.Rng(3)
+    draws(r.combat, 1000)
+    state = r.getstate()
+    other = r.copy()
+    first = draws(r.combat, 100)
+    assert draws(other.combat, 100) == first
+    r.setstate(state)
+    assert draws(r.combat, 100) == first
+
+
+def test_model_games_follow_the_seed():
+    boards = []
+    for i in range(2):
+        model = index.Model(seed=11)
+        controller = index.Controller(model, index.NullView(model=model))
+        controller.populate_room()
+        boards.append([(type(x), x.pos) for x in model.creatures])
+    assert boards[0] == boards[1]
+
+
+def test_fixed():
+    stream = rng.Fixed([0, 2])
+    assert [stream.below(5) for i in range(4)] == [0, 2, 0, 2]
+    assert stream.choice("abc") == "a"
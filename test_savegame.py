@@ -0,0 +1,125 @@
+import pickle
+
+import pytest
+
+import gear as g
+import index
+import savegame
+from custom_exceptions import *
+
+
+class TestSave:
+    def setup_method(self):
+        self.model = index.Model()
+        self.view = index.View(model=self.model)
+        self.controller = index.Controller(self.model, self.view)
+        self.controller.start_game()
+        self.model.player.items.append(g.HealthPotion())
+        spear = g.Spear()
+        spear.pos = (2, 2)
+        self.model.floor_items.append(spear)
+        self.model.turn = 12
+        self.model.level = 3
+        self.model.player.name = "Tester"
+        self.model.player.hp = 4.5
+
+    def check(self, model):
+        assert (model.turn, model.level, model.player.name, model.player.hp) == (12, 3, "Tester", 4.5)
+        assert (model.player.damage, model.player.armor) == (8, 7)
+        assert [type(x) for x in model.player.equipment] == [g.Sword, g.Shield]
+        assert [type(x) for x in model.player.items] == [g.HealthPotion]
+        assert [(type(x), x.pos) for x in model.floor_items] == [(g.Spear, (2, 2))]
+        assert sorted(x.pos for x in model.creatures) == sorted(x.pos for x in self.model.creatures)
+        for creature in model.creatures:
+            assert model.board.occupant_at(creature.pos) is creature
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_round_trip(self, tmp_path, mmap):
+        path = tmp_path / "game.srpg"
+        savegame.save(self.model, path)
+        other = index.Model()
+        savegame.load(path, other, mmap=mmap)
+        self.check(other)
+
+    def test_commands(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self.controller.save_cmd()
+        self.controller.round("d")
+        self.controller.load_cmd()
+        self.check(self.model)
+
+    def test_smaller_than_pickle(self):
+        assert len(savegame.dumps(self.model)) < len(pickle.dumps(self.model))
+
+    def test_bad_file(self, tmp_path):
+        path = tmp_path / "nope.srpg"
+        path.write_bytes(b"x" * 100)
+        with pytest.raises(SaveError):
+            savegame.read(path)
+
+    def test_name_cut_on_a_character(self):
+        self.model.player.name = "a" + "\u00e9" * 16
+        other = savegame.restore(index.Model(), *savegame.parse(savegame.dumps(self.model)))
+        assert other.player.name == "a" + "\u00e9" * 15
+
+    def test_truncated_file(self, tmp_path, monkeypatch):
+        data = savegame.dumps(self.model)
+        path = tmp_path / "short.srpg"
+        for size in (0, 10, len(data) - 1):
+            path.write_bytes(data[:size])
+            with pytest.raises(SaveError):
+                savegame.read(path)
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "savegame.srpg").write_bytes(data[:-1])
+        self.controller.load_cmd()
+        assert "Could not load" in "".join(self.view.buffer)
+
+    def test_truncated_room(self):
+        data = savegame.dumps_room(self.model.board, self.model.creatures[1:], self.model.floor_items)
+        with pytest.raises(SaveError):
+            savegame.loads_room(data[:-1])
+        board, creatures, floor_items = savegame.loads_room(data)
+        assert [x.pos for x in creatures] == [x.pos for x in self.model.creatures[1:]]
+
+    def test_effects_survive(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        potion = g.StrengthPotion()
+        self.model.player.items.append(potion)
+        self.controller.quaff(self.model.player, potion)
+        assert self.model.player.damage == 13
+        self.controller.save_cmd()
+        self.controller.load_cmd()
+        player = self.model.player
+        assert player.damage == 13
+        assert [x.name for x in player.effects] == ["strength"]
+        for i in range(potion.turntimer):
+            self.model.player.hp = 100
+            self.controller.round("a" if i % 2 else "d")
+        assert player.damage == 8
+        assert len(self.model.effects) == 0
+
+    @pytest.mark.parametrize("corrupt", ["entrance", "creature", "gear", "owner"])
+    def test_corrupt_file_changes_nothing(self, tmp_path, monkeypatch, corrupt):
+        self.model.player.items.append(g.StrengthPotion())
+        self.controller.quaff(self.model.player, self.model.player.items[-1])
+        before = savegame.dumps(self.model)
+        data = bytearray(before)
+        rows, cols = self.model.board.shape
+        crecs = savegame.header.size + rows * cols
+        grecs = crecs + len(self.model.creatures) * savegame.creature_record.itemsize
+        erecs = grecs + 4 * savegame.gear_record.itemsize
+        if corrupt == "entrance":
+            data[savegame.header.size:crecs] = bytes(rows * cols)
+        elif corrupt == "creature":
+            data[crecs + savegame.creature_record.itemsize] = 200
+        elif corrupt == "gear":
+            data[grecs] = 200
+        else:
+            data[erecs:erecs + 4] = (99).to_bytes(4, "little")
+        with pytest.raises(SaveError):
+            savegame.parse(bytes(data))
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "savegame.srpg").write_bytes(data)
+        self.controller.load_cmd()
+        assert "Could not load" in "".join(self.view.buffer)
+        assert savegame.dumps(self.model) == before
@@ -0,0 +1,53 @@
+import creatures as c
+import scheduler as sch
+
+
+class FastGoblin(c.Goblin):
+    __slots__ = ()
+    speed = 2.0
+
+
+def ids(due):
+    return [(time, creature.eid) for time, creature in due]
+
+
+class TestScheduler:
+    def setup_method(self):
+        self.scheduler = sch.Scheduler()
+        self.goblins = [c.Goblin() for i in range(3)]
+        for i, goblin in enumerate(self.goblins):
+            goblin.eid = i
+            self.scheduler.add(goblin)
+
+    def act(self, start, end):
+        acted = []
+        for time, creature in self.scheduler.due(start, end):
+            acted.append((time, creature.eid))
+            self.scheduler.done(creature, time)
+        return acted
+
+    def test_ties_go_in_arrival_order(self):
+        assert self.act(0, 1) == [(0, 0), (0, 1), (0, 2)]
+        assert self.act(1, 2) == [(1, 0), (1, 1), (1, 2)]
+
+    def test_fast_creatures_act_more_often(self):
+        self.goblins[1].__class__ = FastGoblin
+        assert self.act(0, 1) == [(0, 0), (0, 1), (0, 2), (0.5, 1)]
+
+    def test_dormant_creatures_are_not_queued(self):
+        troll = c.Troll()
+        troll.eid = 9
+        self.scheduler.add(troll)
+        assert len(self.scheduler) == 3
+        self.scheduler.wake(troll)
+        self.scheduler.wake(troll)
+        assert len(self.scheduler) == 4
+
+    def test_no_catching_up(self):
+        self.act(0, 1)
+        # the clock jumps ahead by ten turns, everybody still acts once
+        assert self.act(11, 12) == [(11, 0), (11, 1), (11, 2)]
+
+    def test_not_handed_back_falls_asleep(self):
+        assert ids(self.scheduler.due(0, 1)) == [(0, 0), (0, 1), (0, 2)]
+        assert len(self.scheduler) == 0
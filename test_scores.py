@@ -0,0 +1,59 @@
+import concurrent.futures
+import datetime
+
+import pytest
+
+import scores
+
+
+def add_many(path, name, n):
+    store = scores.ScoreStore(path)
+    for i in range(n):
+        store.add(i, name)
+
+
+def test_top_and_history(tmp_path):
+    store = scores.ScoreStore(tmp_path / "high_scores")
+    day = datetime.date(2023, 3, 26)
+    for score, name in [(7, "a"), (14, "b"), (8, "a"), (7, "c"), (2, "b")]:
+        store.add(score, name, day)
+        day += datetime.timedelta(days=1)
+    assert [x[:2] for x in store.top()] == [(14, "b"), (8, "a"), (7, "a")]
+    # nothing is lost from the log
+    assert len(store.history()) == 5
+    assert [x[0] for x in store.query(name="b")] == [14, 2]
+    assert [x[0] for x in store.query(start=datetime.date(2023, 3, 27), end=datetime.date(2023, 3, 29))] == [14, 8, 7]
+    assert store.query(name="a", start=datetime.date(2023, 3, 28)) == [(8, "a", datetime.date(2023, 3, 28))]
+
+
+def test_concurrent_appends(tmp_path):
+    """Processes finishing games at the same time shouldn't lose or mangle records."""
+    path = tmp_path / "high_scores"
+    with concurrent.futures.ProcessPoolExecutor(4) as pool:
+        list(pool.map(add_many, [path] * 4, "wxyz", [50] * 4))
+    store = scores.ScoreStore(path)
+    assert len(store.history()) == 200
+    assert len(store.query(name="x")) == 50
+    assert [x[0] for x in store.top()] == [49, 49, 49]
+
+
+def test_awkward_names(tmp_path):
+    store = scores.ScoreStore(tmp_path / "high_scores")
+    day = datetime.date(2023, 3, 26)
+    cut = "a" + "é" * 16
+    store.add(5, cut, day)
+    store.add(3, "tab\there\nnewline \\t", day)
+    assert store.query(name=cut) == [(5, "a" + "é" * 15, day)]
+    assert store.top() == [(5, "a" + "é" * 15, day), (3, "tab\there\nnewline \\t", day)]
+    store.add(4, "next", day)
+    assert [x[0] for x in store.top()] == [5, 4, 3]
+    assert len(store.format_top().splitlines()) == 4
+
+
+def test_dates_in_order(tmp_path):
+    store = scores.ScoreStore(tmp_path / "high_scores")
+    store.add(5, "a", datetime.date(2023, 3, 26))
+    store.add(6, "a", datetime.date(2023, 3, 26))
+    with pytest.raises(ValueError):
+        store.add(7, "a", datetime.date(2023, 3, 25))
+    assert [x[0] for x in store.query()] == [5, 6]
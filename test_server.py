@@ -0,0 +1,47 @@
+import asyncio
+
+import gear as g
+import loadgen
+import server
+
+
+def test_session_prompts():
+    """Item questions should wait for the next line instead of blocking."""
+    session = server.Session()
+    assert session.greeting().endswith("Name your character:")
+    assert session.feed("Tester").endswith("'help':")
+    assert session.model.player.name == "Tester"
+
+    helm = g.Helm()
+    session.model.player.items.append(helm)
+    reply = session.feed("e")
+    assert "0. helmet" in reply
+    assert reply.endswith("Which item would you like to equip?")
+    reply = session.feed("0")
+    assert "You equip the helmet." in reply
+    assert reply.endswith("'help':")
+    assert helm in session.model.player.equipment
+    assert "save" not in session.controller.commands
+
+
+def test_game_over(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    session = server.Session()
+    session.feed("Tester")
+    session.feed("exit")
+    assert session.over
+    assert "Tester" in session.finish()
+
+
+def test_many_sessions(tmp_path, monkeypatch):
+    """Players on the same server each get their own game."""
+    monkeypatch.chdir(tmp_path)
+
+    async def run():
+        srv = await asyncio.start_server(server.serve_player, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            return await loadgen.run("127.0.0.1", port, players=20, commands=10)
+
+    total, elapsed, latencies = asyncio.run(run())
+    assert total == len(latencies) > 0
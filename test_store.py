@@ -0,0 +1,70 @@
+import pytest
+
+import creatures as c
+import index
+from custom_exceptions import *
+
+
+class TestStore:
+    """Store mode should play like the object mode, but in batches."""
+    def setup_method(self):
+        self.model = index.Model(store=True)
+        self.view = index.View(model=self.model)
+        self.controller = index.Controller(self.model, self.view)
+
+    def add_goblin(self, pos):
+        goblin = c.Goblin()
+        goblin.pos = pos
+        self.model.creatures.append(goblin)
+        return goblin
+
+    def test_views(self):
+        """Creature attributes should read and write through to the store."""
+        goblin = self.add_goblin((1, 1))
+        store = self.model.store
+        assert store.hp[goblin._slot] == 10
+        goblin.hp -= 4
+        assert store.hp[goblin._slot] == 6
+        goblin.pos = (2, 1)
+        assert (store.row[goblin._slot], store.col[goblin._slot]) == (2, 1)
+        assert goblin.aggressive
+        self.model.creatures.remove(goblin)
+        assert goblin.hp == 6
+        assert goblin._store is None
+
+    def test_chase(self):
+        """Chasers step like move_toward and wait when the way is blocked."""
+        self.model.player.pos = (2, 2)
+        first = self.add_goblin((0, 1))
+        second = self.add_goblin((1, 0))
+        blocked = self.add_goblin((2, 0))
+        self.controller.chase_batch()
+        assert first.pos == (1, 1)
+        assert second.pos == (1, 0)
+        assert blocked.pos == (2, 1)
+        assert self.model.board.occupant_at((1, 1)) is first
+        assert self.model.board.occupant[0, 1] == 0
+
+    def test_contested_cell(self):
+        """Two chasers stepping onto the same cell: the earlier slot gets it."""
+        self.model.player.pos = (2, 2)
+        early = self.add_goblin((1, 1))
+        late = self.add_goblin((2, 0))
+        self.controller.chase_batch()
+        assert early.pos == (2, 1)
+        assert late.pos == (2, 0)
+
+    def test_batch_attack(self):
+        """Adjacent chasers all hit the player in the same round."""
+        player = self.model.player
+        player.pos = (2, 2)
+        goblins = [self.add_goblin(pos) for pos in [(1, 2), (3, 2), (2, 1)]]
+        self.controller.chase_batch()
+        assert player.hp == pytest.approx(10 - 3 * (3 / 2))
+        for goblin in goblins:
+            assert goblin.hp == pytest.approx(10 - 3 / 2)
+
+        with pytest.raises(DeathError):
+            for i in range(3):
+                self.model.turn += 1
+                self.controller.chase_batch()
@@ -0,0 +1,67 @@
+import json
+
+import gear as g
+import index
+import telemetry
+
+
+def read(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestTelemetry:
+    def setup_method(self):
+        self.model = index.Model(seed=3)
+        self.view = index.NullView(model=self.model)
+        self.controller = index.Controller(self.model, self.view)
+
+    def test_off_by_default(self):
+        assert self.controller.telemetry is None
+        self.controller.start_game()
+        self.controller.round("a")
+
+    def test_game_events(self, tmp_path):
+        tel = self.controller.telemetry = telemetry.Telemetry(tmp_path)
+        self.controller.start_game()
+        potion = g.HealthPotion()
+        self.model.player.items.append(potion)
+        self.controller.quaff(self.model.player, potion)
+        for wasd in "adadwwww":
+            self.controller.handle(wasd)
+        self.controller.handle("exit")
+        tel.close()
+        events = read(tmp_path / "events.jsonl")
+        kinds = [x["event"] for x in events]
+        assert kinds[:2] == ["equip", "equip"]
+        assert "quaff" in kinds
+        assert "move" in kinds
+        assert kinds[-1] == "game_over"
+        assert events[-1]["cause"] == "quit"
+        assert all({"ts", "turn", "event"} <= x.keys() for x in events)
+        assert tel.written == len(events)
+        assert tel.dropped == tel.skipped == 0
+
+    def test_backpressure_drops_instead_of_blocking(self, tmp_path):
+        # a writer that never gets round to it before close
+        tel = telemetry.Telemetry(tmp_path, capacity=8, interval=60, sample=4)
+        for turn in range(20):
+            tel.emit("move", turn, eid=1, pos=(0, 0))
+        for turn in range(20):
+            tel.emit("attack", turn, attacker=1, defender=2)
+        assert len(tel.buffer) == 8
+        assert tel.skipped > 0 and tel.dropped > 0
+        tel.close()
+        events = read(tmp_path / "events.jsonl")
+        # the newest events survive, then a note of how many didn't
+        assert [x["turn"] for x in events[:-1]] == list(range(12, 20))
+        assert events[-1] == {"ts": events[-1]["ts"], "event": "dropped", "count": 40 - 8}
+
+    def test_rotation(self, tmp_path):
+        tel = telemetry.Telemetry(tmp_path, batch=10, max_bytes=2000, backups=2, interval=60)
+        for turn in range(200):
+            tel.emit("attack", turn, attacker=1, defender=2)
+        tel.close()
+        files = sorted(x.name for x in tmp_path.iterdir())
+        assert files == ["events.1.jsonl", "events.2.jsonl", "events.jsonl"]
+        assert all(x.stat().st_size <= 2000 for x in tmp_path.iterdir())
+        assert read(tmp_path / "events.jsonl")[-1]["turn"] == 199
@@ -0,0 +1,16 @@
+import tournament
+
+
+def test_play_is_reproducible():
+    """The same seed and policy should always play out the same game."""
+    assert tournament.play(7, "attack") == tournament.play(7, "attack")
+
+
+def test_run_and_summarize():
+    """Games spread over the pool should all come back and merge into one row per policy."""
+    results = tournament.run(6, "random", seed=3, max_turns=50, workers=2)
+    assert [x["seed"] for x in results] == list(range(3, 9))
+    rows = tournament.summarize(results)
+    assert len(rows) == 1
+    assert rows[0]["games"] == 6
+    assert rows[0]["killed"] + rows[0]["enlightened"] + rows[0]["timeout"] == 6
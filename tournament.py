@@ -0,0 +1,155 @@
+"""Play lots of games without a terminal and summarize how they went.
+
+Run from the linux command line, for example:
+python3 tournament.py --games 1000 --policy greedy
+
+--sweep 1,2,4,8 times the same games with each number of worker processes instead, and
+prints games per second for each.
+"""
+import argparse
+import concurrent.futures
+import os
+import random
+import time
+from collections import Counter
+
+import numpy as np
+
+import index
+from custom_exceptions import *
+
+
+def random_walk(model, rng):
+    """Stumble around."""
+    return rng.choice("wasd")
+
+
+def step_toward(src, dst):
+    """The wasd key that takes src one tile closer to dst (rows first, like move_toward)."""
+    if dst[0] < src[0]:
+        return "w"
+    elif dst[0] > src[0]:
+        return "s"
+    elif dst[1] < src[1]:
+        return "a"
+    return "d"
+
+
+def greedy(model, rng):
+    """Head straight for the exit."""
+    return step_toward(model.player.pos, model.board.exit)
+
+
+def attack_nearest(model, rng):
+    """Go after the closest creature, then leave once the room is clear."""
+    player = model.player.pos
+    others = [x.pos for x in model.creatures if x is not model.player]
+    if not others:
+        return greedy(model, rng)
+    target = min(others, key=lambda pos: abs(pos[0] - player[0]) + abs(pos[1] - player[1]))
+    return step_toward(player, target)
+
+
+policies = {
+    "random": random_walk,
+    "greedy": greedy,
+    "attack": attack_nearest,
+}
+
+
+def play(seed, policy="greedy", max_turns=1000):
+    """Play one seeded game to the end and report how it went."""
+    rng = random.Random(seed)
+    choose = policies[policy]
+
+    model = index.Model(seed=seed)
+    view = index.NullView(model=model)
+    controller = index.Controller(model, view)
+    controller.start_game()
+
+    cause = "timeout"
+    while model.turn < max_turns:
+        try:
+            controller.round(choose(model, rng))
+        except DeathError:
+            cause = "enlightened" if model.level == 10 else "killed"
+            break
+    return {
+        "seed": seed,
+        "policy": policy,
+        "level": model.level,
+        "score": model.player.score,
+        "turns": model.turn,
+        "cause": cause,
+    }
+
+
+def _play(args):
+    return play(*args)
+
+
+def run(games, policy="greedy", seed=0, max_turns=1000, workers=None):
+    """Play games in a process pool and return the per-game results in seed order."""
+    jobs = [(seed + i, policy, max_turns) for i in range(games)]
+    # about four chunks per worker, as many workers as the pool will start
+    chunksize = max(1, games // (4 * (workers or os.cpu_count() or 1)))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_play, jobs, chunksize=chunksize))
+
+
+def summarize(results):
+    """Merge per-game results into one row per policy."""
+    by_policy = {}
+    for result in results:
+        by_policy.setdefault(result["policy"], []).append(result)
+
+    rows = []
+    for policy, games in by_policy.items():
+        causes = Counter(x["cause"] for x in games)
+        rows.append({
+            "policy": policy,
+            "games": len(games),
+            "mean_level": np.mean([x["level"] for x in games]),
+            "max_level": max(x["level"] for x in games),
+            "mean_score": np.mean([x["score"] for x in games]),
+            "mean_turns": np.mean([x["turns"] for x in games]),
+            "killed": causes["killed"],
+            "enlightened": causes["enlightened"],
+            "timeout": causes["timeout"],
+        })
+    return rows
+
+
+def format_table(rows):
+    columns = list(rows[0].keys())
+    cells = [[f"{row[x]:.2f}" if isinstance(row[x], float) else str(row[x]) for x in columns] for row in rows]
+    widths = [max(len(x), *(len(row[i]) for row in cells)) for i, x in enumerate(columns)]
+    lines = ["  ".join(x.rjust(w) for x, w in zip(columns, widths))]
+    for row in cells:
+        lines.append("  ".join(x.rjust(w) for x, w in zip(row, widths)))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many headless games.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--policy", choices=list(policies) + ["all"], default="all")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sweep", default=None, help="worker counts to time, for example 1,2,4,8")
+    args = parser.parse_args()
+
+    chosen = list(policies) if args.policy == "all" else [args.policy]
+    if args.sweep:
+        for workers in [int(x) for x in args.sweep.split(",")]:
+            start = time.perf_counter()
+            for policy in chosen:
+                run(args.games, policy, args.seed, args.max_turns, workers)
+            elapsed = time.perf_counter() - start
+            print(f"{workers} workers: {len(chosen) * args.games / elapsed:.1f} games/s")
+    else:
+        results = []
+        for policy in chosen:
+            results += run(args.games, policy, args.seed, args.max_turns, args.workers)
+        print(format_table(summarize(results)))